@@ -6,15 +6,18 @@ Analyzes git diffs and generates documentation updates using AI providers.
 Supports OpenAI (default) and DeepSeek.
 """
 
+import asyncio
+import fnmatch
+import functools
+import hashlib
+import json
 import os
+import re
 import subprocess
 import sys
-import argparse
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from .env file
-load_dotenv()
+import time
+import types
+import zlib
 
 # --- CONFIGURATION MAPPING ---
 PROVIDERS = {
@@ -51,59 +54,610 @@ RULES:
 4. If trivial (typo, formatting), output "NO_UPDATES".
 """
 
+# Built once and shared by every request
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT.strip()}
+_USER_PREFIX = "Here is the Git Diff:\n\n"
+# --single-request: every changed file is sent in one request as a JSON array
+_MULTI_FILE_PREFIX = (
+    "Each element of the JSON array below is one changed file and its Git Diff. "
+    "Document every file and respond with a JSON object of the form "
+    '{"files": [{"path": "<path>", "doc": "<markdown or NO_UPDATES>"}]}.\n\n'
+)
+
+# Obvious credentials are masked before a diff leaves the machine. All patterns
+# are compiled into one alternation so a diff is scanned in a single pass.
+SECRET_PATTERNS = (
+    r"(?<![A-Za-z0-9_-])sk-[A-Za-z0-9_-]{20,}",  # OpenAI / DeepSeek API keys
+    r"AKIA[0-9A-Z]{16}",  # AWS access key IDs
+    r"gh[pousr]_[A-Za-z0-9]{36,}",  # GitHub tokens
+    r"glpat-[A-Za-z0-9_-]{20,}",  # GitLab personal access tokens
+)
+_SECRET_RE = re.compile("|".join(f"(?:{p})" for p in SECRET_PATTERNS))
+REDACTED = "[REDACTED]"
+
+
+class DocGenError(Exception):
+    """Raised when documentation cannot be generated."""
+
+
+class ProviderError(DocGenError):
+    """Raised when a call to an AI provider fails; these are worth retrying."""
+
+
+# Attempts per AI request before giving up (backoff doubles from 1s)
+MAX_ATTEMPTS = 3
+
+# Maximum number of in-flight AI requests in --per-file mode
+MAX_CONCURRENT_REQUESTS = 5
+
+# --- RESPONSE CACHE ---
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sonar-jacoco-docgen")
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
+CACHE_COMPRESS_LEVEL = 6
+# Responses echo the prompt's vocabulary ("### FILE:", the docs folders,
+# Mermaid), so it makes a good preset dictionary for small entries
+_CACHE_ZDICT = SYSTEM_PROMPT.encode("utf-8")
+
+
+def _write_bytes(path, data):
+    """Write ``data`` with one buffer and ``os.write``, looping on short writes."""
+    view = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_file(path, text):
+    """Write ``text`` as UTF-8 with one pre-encoded buffer."""
+    _write_bytes(path, text.encode("utf-8"))
+
+
+def cache_key(diff, cfg):
+    """Build the cache key for a diff sent to a provider configuration."""
+    payload = (diff + SYSTEM_PROMPT + cfg["model"]).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _cache_path(key):
+    """Return the on-disk location of a cache entry."""
+    return os.path.join(CACHE_DIR, f"{key}.md.z")
+
+
+def load_cached_docs(key):
+    """Return a cached response, or None if missing or older than the TTL."""
+    path = _cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        decompressor = zlib.decompressobj(zdict=_CACHE_ZDICT)
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+    except (zlib.error, UnicodeDecodeError):
+        return None  # corrupt entry; treat as a miss
+
+
+def store_cached_docs(key, docs_update):
+    """Save a compressed response to the cache, ignoring write errors."""
+    compressor = zlib.compressobj(CACHE_COMPRESS_LEVEL, zdict=_CACHE_ZDICT)
+    data = compressor.compress(docs_update.encode("utf-8")) + compressor.flush()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_bytes(_cache_path(key), data)
+    except OSError:
+        pass
+
+
+def get_git_diff(repo_path, limit=None, paths=None):
+    """Get the git diff between the last two commits.
+
+    The diff is read straight from git's stdout pipe. When ``limit`` is given,
+    at most ``limit`` bytes are read and git is stopped once the limit is
+    exceeded, so large diffs are never fully buffered. ``paths`` restricts
+    the diff to the given files.
+
+    Returns:
+        Tuple of (diff, truncated).
+
+    Raises:
+        DocGenError: If git fails or is not installed.
+    """
+    command = ["git", "diff", "HEAD~1", "HEAD"]
+    if paths:
+        command += ["--", *paths]
 
-def get_git_diff(repo_path):
-    """Get the git diff between the last two commits."""
+    try:
+        proc = subprocess.Popen(
+            command,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    except FileNotFoundError as e:
+        raise DocGenError("Git is not installed.") from e
+
+    with proc:
+        data = proc.stdout.read() if limit is None else proc.stdout.read(limit + 1)
+        truncated = limit is not None and len(data) > limit
+        if truncated:
+            proc.terminate()
+            data = memoryview(data)[:limit]  # zero-copy; decoded once below
+            errors = b""
+        else:
+            errors = proc.stderr.read()
+        returncode = proc.wait()
+
+    if returncode != 0 and not truncated:
+        message = errors.decode("utf-8", errors="replace").strip()
+        raise DocGenError(f"Error running git in {repo_path}: {message}")
+
+    return str(data, "utf-8", errors="replace"), truncated
+
+
+def get_changed_files(repo_path):
+    """Get the paths changed between the last two commits."""
     try:
         result = subprocess.run(
-            ["git", "diff", "HEAD~1", "HEAD"],
+            ["git", "diff", "--name-only", "HEAD~1", "HEAD"],
             cwd=repo_path,
             capture_output=True,
             text=True,
             check=True
         )
-        return result.stdout
+        return [line for line in result.stdout.splitlines() if line]
     except subprocess.CalledProcessError as e:
-        print(f"Error running git in {repo_path}: {e}")
-        sys.exit(1)
-    except FileNotFoundError:
-        print("Error: Git is not installed.")
-        sys.exit(1)
+        raise DocGenError(f"Error running git in {repo_path}: {e}") from e
+    except FileNotFoundError as e:
+        raise DocGenError("Git is not installed.") from e
 
 
-def generate_docs(diff_content, provider_key):
-    """Generate documentation using the specified AI provider."""
-    # Load configuration based on the chosen provider
+# Files whose changes never need documentation (lockfiles, minified bundles)
+TRIVIAL_FILE_PATTERNS = (
+    "*.lock",
+    "package-lock.json",
+    "poetry.lock",
+    "yarn.lock",
+    "*.min.js",
+)
+
+
+def _is_trivial_path(path):
+    """Check whether a changed file matches one of the trivial file patterns."""
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in TRIVIAL_FILE_PATTERNS)
+
+
+def is_trivial(repo_path):
+    """Check whether the last commit only changed whitespace or trivial files.
+
+    A single ``git diff -w --numstat`` call does the classification: files
+    whose changes are whitespace-only are omitted by ``-w``, and the remaining
+    paths are checked against ``TRIVIAL_FILE_PATTERNS``. No pass over the
+    diff text is needed on the Python side.
+    """
+    try:
+        numstat = subprocess.run(
+            ["git", "diff", "-w", "--numstat", "HEAD~1", "HEAD"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Let the regular diff path report git problems
+        return False
+
+    paths = [line.split("\t", 2)[-1] for line in numstat.stdout.splitlines() if line]
+    return all(_is_trivial_path(path) for path in paths)
+
+
+def _load_env(filepath=".env"):
+    """Load ``KEY=VALUE`` lines from ``filepath`` without overriding the environment."""
+    try:
+        with open(filepath) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return
+    for line in lines:
+        line = line.strip()
+        # Skip comments and empty lines
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        value = value.strip()
+        # Remove quotes if present
+        if value and value[0] in ('"', "'") and value[-1] == value[0]:
+            value = value[1:-1]
+        os.environ.setdefault(key.strip(), value)
+
+
+def _get_provider_config(provider_key):
+    """Return the provider configuration and API key.
+
+    Raises:
+        DocGenError: If the provider's API key is not configured.
+    """
     config = PROVIDERS[provider_key]
     api_key = os.getenv(config["env_var"])
 
     if not api_key:
-        print(f"Error: {config['env_var']} environment variable not found.")
-        sys.exit(1)
+        raise DocGenError(f"{config['env_var']} environment variable not found.")
 
-    print(f"Using Provider:  {config['name']}")
+    return config, api_key
+
+
+# HTTP transport tuning shared by the provider clients
+HTTP_KEEPALIVE_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY = 30.0
+HTTP_CONNECT_RETRIES = 3
+HTTP_CONNECT_TIMEOUT = 5.0
+# Longest wait between two chunks of a streamed response
+HTTP_STREAM_TIMEOUT = 60.0
+# Longest wait for a whole non-streamed completion (the openai SDK default)
+HTTP_TIMEOUT = 600.0
+
+
+def _transport_options():
+    """Keyword arguments for a tuned httpx transport.
+
+    Keep-alive is sized for the concurrent fan-out so parallel requests reuse
+    warm connections, and transient connect failures are retried in the
+    transport instead of failing the request.
+    """
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "retries": HTTP_CONNECT_RETRIES,
+    }
+
+
+def _client_options(timeout):
+    """Keyword arguments shared by the blocking and async httpx clients."""
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT),
+        "follow_redirects": True,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(provider_key):
+    """Return the shared blocking client for a provider.
 
-    # Initialize Client
+    Clients are memoized so repeated calls reuse one connection pool instead
+    of paying a new TLS handshake each time. The blocking client serves the
+    non-streamed requests, so it waits up to HTTP_TIMEOUT for an answer.
+    """
+    # Imported lazily so empty, trivial and cached runs never load openai
+    import httpx
+    from openai import OpenAI
+
+    config, api_key = _get_provider_config(provider_key)
+    http_client = httpx.Client(
+        transport=httpx.HTTPTransport(**_transport_options()),
+        **_client_options(HTTP_TIMEOUT),
+    )
     # Note: If base_url is None, the library defaults to OpenAI
-    client = OpenAI(api_key=api_key, base_url=config["base_url"])
+    return OpenAI(api_key=api_key, base_url=config["base_url"], http_client=http_client)
+
+
+@functools.lru_cache(maxsize=None)
+def get_async_client(provider_key):
+    """Return the shared async client for a provider (see ``get_client``).
+
+    It serves the streamed requests, so a stalled stream fails after
+    HTTP_STREAM_TIMEOUT without a chunk.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+
+    config, api_key = _get_provider_config(provider_key)
+    http_client = httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(**_transport_options()),
+        **_client_options(HTTP_STREAM_TIMEOUT),
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=config["base_url"], http_client=http_client)
+
+
+def redact_secrets(text):
+    """Mask anything matching ``SECRET_PATTERNS`` in ``text``."""
+    return _SECRET_RE.sub(REDACTED, text)
+
+
+def _build_messages(diff_content, prefix=_USER_PREFIX):
+    """Build the chat messages for a diff, reusing the shared system message.
+
+    Every request goes through here, so this is where secrets are redacted.
+    """
+    content = prefix + redact_secrets(diff_content)
+    return [_SYSTEM_MSG, {"role": "user", "content": content}]
+
+
+def generate_docs(diff_content, provider_key):
+    """Generate documentation using the specified AI provider (blocking, no streaming)."""
+    config = PROVIDERS[provider_key]
+    client = get_client(provider_key)
+
+    print(f"Using Provider:  {config['name']}")
 
     try:
         response = client.chat.completions.create(
             model=config["model"],
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Here is the Git Diff:\n\n{diff_content}"}
-            ],
+            messages=_build_messages(diff_content),
             temperature=0.2,
             stream=False
         )
         return response.choices[0].message.content
     except Exception as e:
-        print(f"Error calling API: {e}")
-        sys.exit(1)
+        raise ProviderError(f"Error calling API: {e}") from e
 
 
-def main():
+def generate_docs_multi(files, provider_key):
+    """Document several files with a single blocking request.
+
+    Args:
+        files: Mapping of changed path to its diff.
+        provider_key: The AI provider to use.
+
+    Returns:
+        Mapping of path to generated documentation, for the paths the model answered.
+    """
+    config = PROVIDERS[provider_key]
+    client = get_client(provider_key)
+
+    print(f"Using Provider:  {config['name']} ({len(files)} files in one request)")
+
+    payload = json.dumps([{"path": p, "diff": d} for p, d in files.items()], ensure_ascii=False)
+    try:
+        response = client.chat.completions.create(
+            model=config["model"],
+            messages=_build_messages(payload, _MULTI_FILE_PREFIX),
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            stream=False
+        )
+        content = response.choices[0].message.content
+    except Exception as e:
+        raise ProviderError(f"Error calling API: {e}") from e
+
+    try:
+        entries = json.loads(content)["files"]
+        return {e["path"]: e["doc"] for e in entries if isinstance(e, dict) and "doc" in e}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ProviderError(f"Malformed JSON response: {e}") from e
+
+
+async def generate_docs_async(diff_content, provider_key, output_file):
+    """Stream documentation from the AI provider, writing tokens as they arrive.
+
+    Tokens are appended to ``<output_file>.partial`` while the response is
+    streaming, so partial output is persisted before the request completes.
+    The partial file is moved into place once the response is finished, or
+    removed if the model reports that no updates are needed.
+
+    Returns:
+        The full generated documentation.
+    """
+    config = PROVIDERS[provider_key]
+    client = get_async_client(provider_key)
+
+    print(f"Using Provider:  {config['name']}")
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    partial_file = output_file + ".partial"
+    parts = []
+
+    try:
+        stream = await client.chat.completions.create(
+            model=config["model"],
+            messages=_build_messages(diff_content),
+            temperature=0.2,
+            stream=True
+        )
+        # Line buffered: the partial file grows a line at a time instead of
+        # costing a write syscall per token; closing flushes the last line
+        with open(partial_file, "w", encoding="utf-8", buffering=1) as f:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                if token:
+                    f.write(token)
+                    parts.append(token)
+    except Exception as e:
+        raise ProviderError(f"Error calling API: {e}") from e
+
+    docs_update = "".join(parts)
+    if "NO_UPDATES" in docs_update:
+        os.remove(partial_file)
+    else:
+        os.replace(partial_file, output_file)
+    return docs_update
+
+
+def _save_docs(output_file, docs_update):
+    """Write a finished response to ``output_file`` unless no updates are needed."""
+    if "NO_UPDATES" not in docs_update:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        _write_file(output_file, docs_update)
+
+
+async def _save_docs_async(output_file, docs_update):
+    """Run ``_save_docs`` on the default executor so concurrent jobs write in parallel."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, _save_docs, output_file, docs_update)
+
+
+def _diff_limit(provider_key):
+    """Safety truncation limit for a provider (DeepSeek handles larger contexts better)."""
+    return 30000 if provider_key == "deepseek" else 15000
+
+
+async def _with_retries(provider_key, call):
+    """Await ``call()``, retrying a ProviderError in-process with exponential backoff."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await call()
+        except ProviderError as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt
+            print(f"[{PROVIDERS[provider_key]['name']}] {e}; retrying in {delay}s...")
+            await asyncio.sleep(delay)
+
+
+async def _run_provider(diff, provider_key, output_file, no_stream=False, use_cache=True):
+    """Generate docs for one provider and save them to ``output_file``."""
+    # The diff is read up to the largest selected limit; trim it for smaller ones
+    limit = _diff_limit(provider_key)
+    if len(diff) > limit:
+        diff = diff[:limit]
+
+    key = cache_key(diff, PROVIDERS[provider_key])
+    if use_cache:
+        cached = load_cached_docs(key)
+        if cached is not None:
+            print(f"Using cached response for {PROVIDERS[provider_key]['name']}")
+            await _save_docs_async(output_file, cached)
+            return cached
+
+    loop = asyncio.get_running_loop()
+
+    async def attempt():
+        if no_stream:
+            docs_update = await loop.run_in_executor(None, generate_docs, diff, provider_key)
+            await _save_docs_async(output_file, docs_update)
+            return docs_update
+        return await generate_docs_async(diff, provider_key, output_file)
+
+    docs_update = await _with_retries(provider_key, attempt)
+    await loop.run_in_executor(None, store_cached_docs, key, docs_update)
+    return docs_update
+
+
+def submit_batch(diffs, output_dir, provider_key="openai"):
+    """Submit diffs through the OpenAI Batch API instead of waiting for responses.
+
+    The request ids and batch id are recorded in ``<output_dir>/batch.json``;
+    results are downloaded later with ``--collect-batch``.
+
+    Args:
+        diffs: Mapping of output file name (relative to ``output_dir``) to diff.
+        output_dir: Directory the suggestions will be written to.
+        provider_key: Provider to submit to (only OpenAI offers a Batch API).
+
+    Returns:
+        The id of the submitted batch.
+    """
+    config = PROVIDERS[provider_key]
+    client = get_client(provider_key)
+
+    lines = []
+    for name, diff in diffs.items():
+        lines.append(json.dumps({
+            "custom_id": name,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": config["model"],
+                "messages": _build_messages(diff[:_diff_limit(provider_key)]),
+                "temperature": 0.2,
+            },
+        }))
+
+    try:
+        batch_file = client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+    except Exception as e:
+        raise DocGenError(f"Error submitting batch: {e}") from e
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "batch.json"), "w") as f:
+        json.dump({"batch_id": batch.id, "provider": provider_key, "files": list(diffs)}, f, indent=2)
+
+    return batch.id
+
+
+def collect_batch(batch_id, output_dir, provider_key="openai"):
+    """Download the results of a finished batch into ``output_dir``.
+
+    Returns:
+        List of (provider_key, output_file, result) tuples, or None if the
+        batch has not finished yet.
+    """
+    client = get_client(provider_key)
+
+    try:
+        batch = client.batches.retrieve(batch_id)
+    except Exception as e:
+        raise DocGenError(f"Error retrieving batch: {e}") from e
+
+    print(f"Batch status:    {batch.status}")
+    if batch.status != "completed":
+        return None
+    if not batch.output_file_id:
+        return []
+
+    try:
+        content = client.files.content(batch.output_file_id).text
+    except Exception as e:
+        raise DocGenError(f"Error downloading batch results: {e}") from e
+
+    results = []
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        output_file = os.path.join(output_dir, entry["custom_id"])
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            error = entry.get("error") or response.get("body")
+            results.append((provider_key, output_file, DocGenError(f"Request failed: {error}")))
+            continue
+
+        docs_update = response["body"]["choices"][0]["message"]["content"]
+        _save_docs(output_file, docs_update)
+        results.append((provider_key, output_file, docs_update))
+
+    return results
+
+
+# Values used for a bare invocation; the parser shares them via set_defaults
+DEFAULT_ARGS = {
+    "repo": ".",
+    "output": None,
+    "provider": ["openai"],
+    "no_stream": False,
+    "per_file": False,
+    "single_request": False,
+    "batch": False,
+    "collect_batch": None,
+    "no_cache": False,
+}
+
+
+def _build_parser():
+    """Build the command-line parser (only needed when flags are given)."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Generate Docs-as-Code updates from git changes.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -112,7 +666,12 @@ Examples:
   %(prog)s                          # Use OpenAI (default) on current repo
   %(prog)s --provider deepseek      # Use DeepSeek instead
   %(prog)s -p deepseek -r /my/repo  # DeepSeek on specific repo
+  %(prog)s -p openai deepseek       # Compare both providers side by side
   %(prog)s -o ./my-docs             # Custom output directory
+  %(prog)s --per-file               # One suggestion file per changed file
+  %(prog)s --per-file --single-request  # Same, but all files in one request
+  %(prog)s --batch                  # Submit via the OpenAI Batch API (CI)
+  %(prog)s --collect-batch BATCH_ID # Fetch the results of a submitted batch
         """
     )
 
@@ -130,13 +689,223 @@ Examples:
     # Provider Argument
     parser.add_argument(
         "--provider", "-p",
+        nargs="+",
         choices=list(PROVIDERS.keys()),
-        default="openai",
-        help="Choose the AI provider (default: openai)"
+        default=["openai"],
+        help="Choose one or more AI providers, queried concurrently (default: openai)"
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the full response instead of streaming tokens to disk"
+    )
+    parser.add_argument(
+        "--per-file",
+        action="store_true",
+        help="Analyze each changed file separately with concurrent requests, "
+             "also collecting the results in docs_suggestion.json"
+    )
+    parser.add_argument(
+        "--single-request",
+        action="store_true",
+        help="With --per-file, document every file in one request per provider "
+             "(for rate-limited accounts)"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit through the OpenAI Batch API and return without waiting"
+    )
+    parser.add_argument(
+        "--collect-batch",
+        metavar="BATCH_ID",
+        help="Download the results of a batch submitted with --batch"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the AI provider, ignoring cached responses"
+    )
+    parser.set_defaults(**DEFAULT_ARGS)
+    return parser
+
+
+def main():
+    # Load environment variables from .env file
+    _load_env()
+
+    if len(sys.argv) == 1:
+        # Common no-flag invocation: skip building the parser entirely
+        args = types.SimpleNamespace(**DEFAULT_ARGS)
+    else:
+        parser = _build_parser()
+        args = parser.parse_args()
+        args.provider = list(dict.fromkeys(args.provider))  # drop duplicates, keep order
+        if (args.batch or args.collect_batch) and args.provider != ["openai"]:
+            parser.error("--batch and --collect-batch are only supported for the openai provider")
+        if args.single_request and (not args.per_file or args.batch):
+            parser.error("--single-request requires --per-file and cannot be used with --batch")
+    try:
+        asyncio.run(main_async(args))
+    except DocGenError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def _output_files(output_dir, stem, providers, ext=".md"):
+    """Map each provider to its output file, suffixed by provider when comparing several."""
+    if len(providers) == 1:
+        return {providers[0]: os.path.join(output_dir, f"{stem}{ext}")}
+    return {p: os.path.join(output_dir, f"{stem}_{p}{ext}") for p in providers}
+
+
+async def _run_providers(diff, output_files, args):
+    """Run the providers in ``output_files`` on one diff concurrently."""
+    providers = list(output_files)
+    tasks = [
+        _run_provider(diff, p, output_files[p], args.no_stream, not args.no_cache)
+        for p in providers
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return [(p, output_files[p], result) for p, result in zip(providers, results)]
+
+
+def _file_stem(path):
+    """Output file stem for a changed file in --per-file mode."""
+    return path.replace("/", "__")
+
+
+def _diff_hash(diff):
+    """Fingerprint of a per-file diff, recorded in the JSON manifest."""
+    return hashlib.blake2b(diff.encode(), digest_size=16).hexdigest()
+
+
+def load_manifest(path):
+    """Load a previous --per-file JSON manifest, or an empty one."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(path, manifest):
+    """Write a --per-file JSON manifest mapping path -> {hash, content}."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_file(path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+
+async def _run_file(semaphore, repo_path, path, output_dir, args, manifests):
+    """Generate docs for a single changed file, bounded by ``semaphore``.
+
+    Providers whose manifest already holds a response for this exact diff are
+    skipped; fresh responses are recorded in ``manifests``.
+    """
+    async with semaphore:
+        limit = max(_diff_limit(p) for p in args.provider)
+        loop = asyncio.get_running_loop()
+        diff, _ = await loop.run_in_executor(None, get_git_diff, repo_path, limit, [path])
+        if not diff.strip():
+            return []
+        digest = _diff_hash(diff)
+        output_files = {
+            p: output_file
+            for p, output_file in _output_files(output_dir, _file_stem(path), args.provider).items()
+            if manifests[p].get(path, {}).get("hash") != digest
+        }
+        if not output_files:
+            print(f"Skipping {path}: unchanged since the last run")
+            return []
+        results = await _run_providers(diff, output_files, args)
+        for provider_key, _, result in results:
+            if not isinstance(result, Exception):
+                manifests[provider_key][path] = {"hash": digest, "content": result}
+        return results
+
 
-    args = parser.parse_args()
+async def _run_combined_provider(diffs, provider_key, output_dir, args, manifest):
+    """Document every pending file for one provider with a single request.
 
+    Files are added until the provider's diff limit is reached; the rest are
+    left out of the manifest so the next run picks them up.
+    """
+    digests = {path: _diff_hash(diff) for path, diff in diffs.items()}
+    pending = {
+        path: diff for path, diff in diffs.items()
+        if manifest.get(path, {}).get("hash") != digests[path]
+    }
+    for path in diffs:
+        if path not in pending:
+            print(f"Skipping {path}: unchanged since the last run")
+    if not pending:
+        return []
+
+    budget = _diff_limit(provider_key)
+    included = {}
+    for path, diff in pending.items():
+        if included and len(diff) > budget:
+            break
+        included[path] = diff[:budget]
+        budget -= len(included[path])
+    if len(included) < len(pending):
+        print(f"Warning: {len(pending) - len(included)} file(s) did not fit into one request "
+              f"for {PROVIDERS[provider_key]['name']}; run again to document them.")
+
+    output_files = {
+        path: _output_files(output_dir, _file_stem(path), args.provider)[provider_key]
+        for path in included
+    }
+    loop = asyncio.get_running_loop()
+    try:
+        docs = await _with_retries(
+            provider_key,
+            lambda: loop.run_in_executor(None, generate_docs_multi, included, provider_key),
+        )
+    except DocGenError as e:
+        return [(provider_key, output_files[path], e) for path in included]
+
+    results = []
+    for path, output_file in output_files.items():
+        if path not in docs:
+            error = DocGenError(f"No documentation returned for {path}")
+            results.append((provider_key, output_file, error))
+            continue
+        await _save_docs_async(output_file, docs[path])
+        manifest[path] = {"hash": digests[path], "content": docs[path]}
+        results.append((provider_key, output_file, docs[path]))
+    return results
+
+
+async def _run_combined(repo_path, paths, output_dir, args, manifests):
+    """Document all changed files with one request per provider (--single-request)."""
+    limit = max(_diff_limit(p) for p in args.provider)
+    loop = asyncio.get_running_loop()
+    file_diffs = await asyncio.gather(
+        *(loop.run_in_executor(None, get_git_diff, repo_path, limit, [path]) for path in paths)
+    )
+    diffs = {path: diff for path, (diff, _) in zip(paths, file_diffs) if diff.strip()}
+    per_provider = await asyncio.gather(
+        *(_run_combined_provider(diffs, p, output_dir, args, manifests[p]) for p in args.provider)
+    )
+    return [item for provider_results in per_provider for item in provider_results]
+
+
+def _report(provider_key, output_file, result):
+    """Print the outcome of one generation."""
+    name = PROVIDERS[provider_key]["name"]
+    if isinstance(result, Exception):
+        print(f"[{name}] Error: {result}")
+    elif "NO_UPDATES" in result:
+        print(f"[{name}] No documentation updates required for {output_file}.")
+    else:
+        print("\n" + "=" * 50)
+        print(f"[{name}] DONE! Review suggestions in:\n   {output_file}")
+        print("=" * 50)
+
+
+async def main_async(args):
+    """Run the documentation generator for parsed command-line arguments."""
     # Resolve Paths
     repo_path = os.path.abspath(os.path.expanduser(args.repo))
     if args.output:
@@ -146,35 +915,72 @@ Examples:
 
     print(f"Project Path:    {repo_path}")
 
-    # Get Changes
-    diff = get_git_diff(repo_path)
+    if args.collect_batch:
+        results = collect_batch(args.collect_batch, output_dir)
+        if results is None:
+            print("Batch is not finished yet; try again later.")
+            return
+        for provider_key, output_file, result in results:
+            _report(provider_key, output_file, result)
+        return
+
+    # Get Changes (only as much as the largest provider limit)
+    limit = max(_diff_limit(p) for p in args.provider)
+    diff, truncated = get_git_diff(repo_path, limit)
     if not diff.strip():
         print("No changes found in the last commit.")
         return
+    if is_trivial(repo_path):
+        print("No substantive changes.")
+        return
 
-    # Safety Truncate (DeepSeek handles larger contexts better)
-    limit = 30000 if args.provider == "deepseek" else 15000
-    if len(diff) > limit:
-        print(f"Warning: Diff is large. Truncating to {limit} chars...")
-        diff = diff[:limit]
+    if args.per_file:
+        paths = [p for p in get_changed_files(repo_path) if not _is_trivial_path(p)]
+
+    if args.batch:
+        if args.per_file:
+            diffs = {f"{_file_stem(path)}.md": get_git_diff(repo_path, limit, [path])[0]
+                     for path in paths}
+        else:
+            diffs = {"docs_suggestion.md": diff}
+        batch_id = submit_batch(diffs, output_dir)
+        print(f"Batch submitted: {batch_id}")
+        print(f"Collect results with: --collect-batch {batch_id}")
+        return
 
     # Generate Content
     print("AI is analyzing changes...")
-    docs_update = generate_docs(diff, args.provider)
-
-    # Save Output
-    if "NO_UPDATES" in docs_update:
-        print("No documentation updates required.")
+    if args.per_file:
+        # Each file gets its own request, so nothing is lost to truncation
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        manifest_files = _output_files(output_dir, "docs_suggestion", args.provider, ".json")
+        manifests = {
+            p: {} if args.no_cache else load_manifest(manifest_files[p]) for p in args.provider
+        }
+        if args.single_request:
+            results = await _run_combined(repo_path, paths, output_dir, args, manifests)
+        else:
+            per_file = await asyncio.gather(
+                *(_run_file(semaphore, repo_path, path, output_dir, args, manifests)
+                  for path in paths)
+            )
+            results = [item for file_results in per_file for item in file_results]
+        # All per-file results in one file, limited to the files of this commit
+        for p, manifest_file in manifest_files.items():
+            manifest = {path: manifests[p][path] for path in paths if path in manifests[p]}
+            save_manifest(manifest_file, manifest)
     else:
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, "docs_suggestion.md")
+        if truncated:
+            print(f"Warning: Diff is large. Truncating to {limit} chars...")
+        output_files = _output_files(output_dir, "docs_suggestion", args.provider)
+        results = await _run_providers(diff, output_files, args)
 
-        with open(output_file, "w") as f:
-            f.write(docs_update)
-
-        print("\n" + "=" * 50)
-        print(f"DONE! Review suggestions in:\n   {output_file}")
-        print("=" * 50)
+    # Report Output
+    for provider_key, output_file, result in results:
+        _report(provider_key, output_file, result)
+    failed = sum(isinstance(result, Exception) for _, _, result in results)
+    if failed:
+        raise DocGenError(f"{failed} of {len(results)} generation(s) failed.")
 
 
 if __name__ == "__main__":
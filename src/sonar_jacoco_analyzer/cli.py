@@ -6,6 +6,7 @@ import atexit
 import json
 import os
 import readline
+import subprocess
 import sys
 from collections import defaultdict
 from datetime import datetime, timezone
@@ -48,7 +49,11 @@ from .commit_cli import (
     fetch_anthropic_credits,
     fetch_deepseek_credits,
 )
-from .docs_generator import run_docs_generator, PROVIDERS as DOCS_PROVIDERS
+from .docs_generator import (
+    get_api_key as get_docs_api_key,
+    run_docs_generator,
+    PROVIDERS as DOCS_PROVIDERS,
+)
 
 console = Console()
 
@@ -1200,7 +1205,6 @@ def run_jacoco_analysis(path: str = None):
             # Ask if user wants to copy to clipboard
             if Confirm.ask("Copy AI prompt to clipboard?", default=True):
                 try:
-                    import subprocess
                     # Try xclip (Linux)
                     process = subprocess.Popen(
                         ["xclip", "-selection", "clipboard"],
@@ -1246,6 +1250,9 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
         finally:
             readline.set_completer(None)
 
+    # Resolved once; run_docs_generator and the prompts below all use it
+    repo_path = os.path.abspath(os.path.expanduser(repo_path))
+
     # Get diff source
     console.print()
     console.print("[bold]Select change source to analyze:[/bold]")
@@ -1312,9 +1319,9 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
             status_icon = "[red]○[/red]"
 
             if prov == "openai":
-                api_key = os.getenv("OPENAI_API_KEY")
+                api_key = get_docs_api_key(prov)
                 if api_key:
-                    with console.status(f"[cyan]Checking {prov_info['name']} credits...[/cyan]"):
+                    with console.status(f"[cyan]Checking {prov_info.name} credits...[/cyan]"):
                         credits = fetch_openai_credits(api_key)
                     if credits:
                         remaining = credits.get("remaining")
@@ -1331,9 +1338,9 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
                     else:
                         credit_str = "[red]Invalid key[/red]"
             elif prov == "deepseek":
-                api_key = os.getenv("DEEPSEEK_API_KEY")
+                api_key = get_docs_api_key(prov)
                 if api_key:
-                    with console.status(f"[cyan]Checking {prov_info['name']} credits...[/cyan]"):
+                    with console.status(f"[cyan]Checking {prov_info.name} credits...[/cyan]"):
                         credits = fetch_deepseek_credits(api_key)
                     if credits:
                         remaining = credits.get("remaining")
@@ -1347,7 +1354,7 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
             elif prov == "anthropic":
                 api_key = os.getenv("ANTHROPIC_API_KEY")
                 if api_key:
-                    with console.status(f"[cyan]Checking {prov_info['name']} credits...[/cyan]"):
+                    with console.status(f"[cyan]Checking {prov_info.name} credits...[/cyan]"):
                         credits = fetch_anthropic_credits(api_key)
                     if credits:
                         credit_str = "[yellow]See console[/yellow]"
@@ -1362,7 +1369,7 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
             prov_info = DOCS_PROVIDERS[prov]
             cred_info = provider_credits.get(prov, {"credit_str": "[dim]N/A[/dim]", "status_icon": "[red]○[/red]"})
             console.print(
-                f"    {cred_info['status_icon']} [green][{i}][/green] {prov_info['name']} "
+                f"    {cred_info['status_icon']} [green][{i}][/green] {prov_info.name} "
                 f"- Credit: {cred_info['credit_str']}"
             )
         console.print()
@@ -1382,7 +1389,7 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
     # Get output directory if not provided
     if not output_dir:
         console.print()
-        default_output = os.path.join(os.path.abspath(repo_path), "docs")
+        default_output = os.path.join(repo_path, "docs")
         try:
             output_dir = Prompt.ask(
                 "Output directory",
@@ -1394,8 +1401,8 @@ def run_docs_generation(repo_path: str = None, output_dir: str = None, provider:
 
     # Run the generator
     console.print()
-    console.print(f"[dim]Repository:[/dim]  {os.path.abspath(repo_path)}")
-    console.print(f"[dim]Provider:[/dim]    {DOCS_PROVIDERS[provider]['name']}")
+    console.print(f"[dim]Repository:[/dim]  {repo_path}")
+    console.print(f"[dim]Provider:[/dim]    {DOCS_PROVIDERS[provider].name}")
     console.print(f"[dim]Diff source:[/dim] {diff_source}")
     if commit_id:
         console.print(f"[dim]Commit ID:[/dim]   {commit_id}")
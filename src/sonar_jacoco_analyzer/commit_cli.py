@@ -3,64 +3,119 @@ Interactive CLI for AI-powered commit message generation.
 """
 
 import atexit
-import glob
+import hashlib
+import json
 import os
+import re
 import readline
+import shutil
+import subprocess
 import sys
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # History file for input persistence (shared with main CLI)
 HISTORY_FILE = os.path.expanduser("~/.sonar_jacoco_history")
 HISTORY_MAX_LENGTH = 500
 _history_initialized = False
+_saved_history_state = None  # (length, last entry) of the history on disk
+_path_completion_configured = False
+
+# Provider credit lookups are cached on disk for a short while, keyed by a
+# hash of the API key (the key itself is never written)
+CREDITS_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "git-commit-ai", "credits.json"
+)
+CREDITS_CACHE_TTL = 60  # seconds
+# Oldest cached lookup shown (marked stale) while a provider is unreachable
+CREDITS_STALE_MAX_AGE = 24 * 60 * 60  # seconds
+# Longest wait for a provider's credit check, per request and for the menu
+CREDITS_TIMEOUT = 3  # seconds
+# Longest wait for the API key check that runs alongside quick mode
+KEY_CHECK_TIMEOUT = 2  # seconds
 
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
+from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from rich.text import Text
-from rich.syntax import Syntax
-from rich.markdown import Markdown
 
 from .commit_config import CommitConfig, ConfigurationError
+from .conventional_commit import CommitType
 from .git_operations import (
+    COMPACT_DIFF_ARGS,
+    ChangeMetrics,
     GitOperations,
-    NotAGitRepositoryError,
     NoStagedChangesError,
+    NotAGitRepositoryError,
     StagedChanges,
-    ChangeMetrics,
-)
-from .github_client import (
-    GitHubClient,
-    GitHubClientError,
-    AuthenticationError as GitHubAuthError,
-    RateLimitError as GitHubRateLimitError,
-    RepositoryInfo as GitHubRepoInfo,
-    BranchInfo as GitHubBranchInfo,
-    CommitInfo as GitHubCommitInfo,
+    parse_numstat_patch,
+    stream_git_output,
 )
-from .gitlab_client import (
-    GitLabClient,
-    GitLabClientError,
-    AuthenticationError as GitLabAuthError,
-    RateLimitError as GitLabRateLimitError,
-    RepositoryInfo as GitLabRepoInfo,
-    BranchInfo as GitLabBranchInfo,
-    CommitInfo as GitLabCommitInfo,
-)
-from .commit_generator import (
-    CommitGenerator,
-    GeneratedCommit,
-    CommitGeneratorError,
-)
-from .commit_splitter import (
-    CommitSplitter,
-    SplitProposal,
-    SplitGroup,
-)
-from .conventional_commit import CommitType
 
-console = Console()
+# The GitHub/GitLab SDKs, the AI client and the splitter are imported inside
+# the workflows that use them, so showing the menu stays cheap
+if TYPE_CHECKING:
+    from .commit_generator import GeneratedCommit
+    from .commit_splitter import SplitProposal
+    from .github_client import BranchInfo as GitHubBranchInfo
+    from .github_client import CommitInfo as GitHubCommitInfo
+    from .github_client import GitHubClient
+    from .github_client import RepositoryInfo as GitHubRepoInfo
+    from .gitlab_client import BranchInfo as GitLabBranchInfo
+    from .gitlab_client import CommitInfo as GitLabCommitInfo
+    from .gitlab_client import GitLabClient
+    from .gitlab_client import RepositoryInfo as GitLabRepoInfo
+
+# Colors come from explicit markup only; rich's auto-highlighter (numbers,
+# paths, UUIDs) would otherwise run its regexes over every printed line.
+console = Console(highlight=False)
+
+# Menu-style inputs that are never worth keeping in the history
+_MENU_PATTERNS = frozenset({
+    "all", "q", "yes", "no", "y", "n",
+    "approve", "edit", "regenerate", "cancel",
+})
+
+# One number or range of a multi-selection such as "1 3-5 7"
+_SELECTION_RE = re.compile(r"(\d+)(?:-(\d+))?")
+
+# Number selections: "3", "1-5", "1 2 3", "1-3 7"
+_NUMBER_MENU_RE = re.compile(r"\d+(?:-\d+)?(?:\s+\d+(?:-\d+)?)*")
+
+
+def _history_state():
+    """Return (length, last entry) of the in-memory readline history."""
+    length = readline.get_current_history_length()
+    return length, readline.get_history_item(length) if length else None
+
+
+def _trim_history_file():
+    """
+    Cut the history file down to its last HISTORY_MAX_LENGTH entries.
+
+    readline.read_history_file() parses the whole file even though only the
+    tail is kept, so an oversized file (e.g. from before the length cap) is
+    trimmed once, atomically, before it is loaded.
+    """
+    with open(HISTORY_FILE, "rb") as f:
+        lines = f.readlines()
+
+    # libedit (macOS) history files start with a format marker line
+    header = lines[:1] if lines and lines[0].startswith(b"_HiStOrY_V2_") else []
+    if len(lines) - len(header) <= HISTORY_MAX_LENGTH:
+        return
+
+    tmp_file = HISTORY_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.writelines(header + lines[-HISTORY_MAX_LENGTH:])
+    os.replace(tmp_file, HISTORY_FILE)
 
 
 def setup_input_history():
@@ -70,18 +125,24 @@ def setup_input_history():
     Loads history from file and configures readline for persistent history.
     This allows users to use up/down arrows to navigate through previous inputs.
     """
-    global _history_initialized
+    global _history_initialized, _saved_history_state
     if _history_initialized:
         return
     _history_initialized = True
 
+    # Piped or scripted input has no use for a line editor or its history
+    if not sys.stdin.isatty():
+        return
+
     # Configure history settings
     readline.set_history_length(HISTORY_MAX_LENGTH)
 
     # Load existing history file if it exists
     try:
         if os.path.exists(HISTORY_FILE):
+            _trim_history_file()
             readline.read_history_file(HISTORY_FILE)
+            _saved_history_state = _history_state()
     except (IOError, OSError, PermissionError):
         # Silently ignore history load errors
         pass
@@ -103,34 +164,15 @@ def is_meaningful_history_entry(entry: str) -> bool:
     Returns:
         True if the entry should be saved, False otherwise.
     """
-    if not entry or not entry.strip():
-        return False
-
-    entry = entry.strip()
-
-    # Filter out single characters (menu selections like "1", "a", "e")
-    if len(entry) == 1:
-        return False
+    entry = entry.strip() if entry else ""
 
-    # Filter out pure numeric entries (menu selections like "1", "2", "12")
-    if entry.isdigit():
+    # Cheapest checks first: single characters and pure numbers (menu
+    # selections like "1", "a", "12"), then common menu-style words
+    if len(entry) <= 1 or entry.isdigit() or entry.lower() in _MENU_PATTERNS:
         return False
 
-    # Filter out common menu-style inputs
-    menu_patterns = {
-        "all", "q", "yes", "no", "y", "n",
-        "approve", "edit", "regenerate", "cancel",
-    }
-    if entry.lower() in menu_patterns:
-        return False
-
-    # Filter out range selections like "1-5", "2-10"
-    if "-" in entry and all(part.isdigit() for part in entry.split("-") if part):
-        return False
-
-    # Filter out space-separated number lists like "1 2 3"
-    parts = entry.split()
-    if all(part.isdigit() or (part.count("-") == 1 and all(p.isdigit() for p in part.split("-") if p)) for part in parts):
+    # Filter out ranges and number lists like "1-5", "1 2 3" or "1-3 7"
+    if _NUMBER_MENU_RE.fullmatch(entry):
         return False
 
     return True
@@ -143,28 +185,30 @@ def save_input_history():
     Called automatically at exit via atexit, but can also be called manually.
     Filters out menu selections and other non-meaningful inputs.
     """
+    global _saved_history_state
     try:
         # Ensure parent directory exists
         history_dir = os.path.dirname(HISTORY_FILE)
         if history_dir and not os.path.exists(history_dir):
             os.makedirs(history_dir, exist_ok=True)
 
-        # Get current history length
-        history_length = readline.get_current_history_length()
+        # Nothing entered since the history was loaded or last saved
+        if _history_state() == _saved_history_state:
+            return
 
-        # Collect meaningful entries
-        meaningful_entries = []
-        for i in range(1, history_length + 1):
-            entry = readline.get_history_item(i)
-            if entry and is_meaningful_history_entry(entry):
-                meaningful_entries.append(entry)
+        # Read the history once, then filter it
+        history_length = readline.get_current_history_length()
+        entries = [readline.get_history_item(i) for i in range(1, history_length + 1)]
+        meaningful_entries = [e for e in entries if e and is_meaningful_history_entry(e)]
 
-        # Clear current history and add back only meaningful entries
-        readline.clear_history()
-        for entry in meaningful_entries:
-            readline.add_history(entry)
+        # Only rebuild the history when something was filtered out
+        if len(meaningful_entries) != history_length:
+            readline.clear_history()
+            for entry in meaningful_entries:
+                readline.add_history(entry)
 
         readline.write_history_file(HISTORY_FILE)
+        _saved_history_state = _history_state()
     except (IOError, OSError, PermissionError):
         # Silently ignore history save errors
         pass
@@ -201,6 +245,53 @@ def show_warning(message: str):
     console.print(f"[yellow]Warning:[/yellow] {message}")
 
 
+# Clipboard tools in order of preference (X11, Wayland, X11, macOS, Windows)
+_CLIPBOARD_COMMANDS = (
+    ("xclip", "-selection", "clipboard"),
+    ("wl-copy",),
+    ("xsel", "--clipboard", "--input"),
+    ("pbcopy",),
+    ("clip",),
+)
+
+
+@lru_cache(maxsize=None)
+def _clipboard_command() -> Optional[Tuple[str, ...]]:
+    """Return the first clipboard tool found on PATH, looked up once."""
+    return next((cmd for cmd in _CLIPBOARD_COMMANDS if shutil.which(cmd[0])), None)
+
+
+def copy_to_clipboard(text: str) -> bool:
+    """
+    Copy text to the system clipboard.
+
+    Args:
+        text: Text to copy.
+
+    Returns:
+        True if the text was copied, False if no clipboard tool is available.
+    """
+    cmd = _clipboard_command()
+    if cmd is None:
+        return False
+    try:
+        subprocess.run(cmd, input=text.encode(), check=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+
+def _expand_vars_and_user(path: str) -> str:
+    """Expand $VAR and ~ in one pass, skipping both when neither can apply."""
+    if "$" in path:
+        # Expand environment variables like $HOME, $USER, etc.
+        path = os.path.expandvars(path)
+    if path.startswith("~"):
+        # Expand ~ to user home directory
+        path = os.path.expanduser(path)
+    return path
+
+
 def expand_path(path: str) -> str:
     """
     Expand environment variables and user home in path.
@@ -211,16 +302,16 @@ def expand_path(path: str) -> str:
     Returns:
         Expanded absolute path.
     """
-    # Expand environment variables like $HOME, $USER, etc.
-    expanded = os.path.expandvars(path)
-    # Expand ~ to user home directory
-    expanded = os.path.expanduser(expanded)
+    expanded = _expand_vars_and_user(path)
     # Convert to absolute path
     if expanded:
         expanded = os.path.abspath(expanded)
     return expanded
 
 
+_completer_cache = {"key": None, "matches": []}
+
+
 def path_completer(text: str, state: int) -> Optional[str]:
     """
     Tab completion function for file paths.
@@ -232,40 +323,67 @@ def path_completer(text: str, state: int) -> Optional[str]:
     Returns:
         Next completion match or None.
     """
+    # Readline asks for state 0, 1, 2, ... with the same text; list the
+    # directory once per Tab press and serve later states from the cache
+    if state == 0 or _completer_cache["key"] != text:
+        _completer_cache["key"] = text
+        _completer_cache["matches"] = _list_path_matches(text)
+
+    try:
+        return _completer_cache["matches"][state]
+    except IndexError:
+        return None
+
+
+def _list_path_matches(text: str) -> List[str]:
+    """
+    List the sorted completions for a partial path.
+
+    Uses a single os.scandir pass; DirEntry.is_dir() comes from the directory
+    listing itself, so directories are marked without an extra stat per match.
+    """
     # Expand variables first
-    expanded = os.path.expandvars(text)
-    expanded = os.path.expanduser(expanded)
+    expanded = _expand_vars_and_user(text)
 
     # Handle empty input
     if not expanded:
         expanded = "./"
 
-    # Add wildcard for glob matching
-    if os.path.isdir(expanded):
-        pattern = os.path.join(expanded, "*")
-    else:
-        pattern = expanded + "*"
-
-    # Get matches
-    matches = glob.glob(pattern)
-
-    # Add trailing slash to directories
-    matches = [m + "/" if os.path.isdir(m) else m for m in matches]
-
-    # Sort matches
-    matches = sorted(matches)
+    # Complete the last path component; a trailing slash lists the directory.
+    # Splitting the string avoids an isdir() stat on every Tab press.
+    dirname, prefix = os.path.split(expanded)
 
+    matches = []
     try:
-        return matches[state]
-    except IndexError:
-        return None
+        with os.scandir(dirname or ".") as entries:
+            for entry in entries:
+                name = entry.name
+                # Like glob, only show hidden files when asked for explicitly
+                if not name.startswith(prefix) or (name[0] == "." and not prefix.startswith(".")):
+                    continue
+                match = os.path.join(dirname, name)
+                # Add trailing slash to directories
+                matches.append(match + "/" if entry.is_dir() else match)
+    except OSError:
+        return []
+
+    return sorted(matches)
 
 
 def setup_path_completion():
     """Configure readline for path tab completion."""
-    # Set the completer function
+    global _path_completion_configured
+    if not sys.stdin.isatty():
+        return
+
+    # Set the completer function (prompts reset it when they finish)
     readline.set_completer(path_completer)
 
+    # Key bindings and delimiters only need to be set up once per process
+    if _path_completion_configured:
+        return
+    _path_completion_configured = True
+
     # Configure completion settings
     readline.set_completer_delims(" \t\n;")
 
@@ -291,15 +409,27 @@ def prompt_for_path(prompt_text: str, default: str = ".") -> str:
     # Setup tab completion
     setup_path_completion()
 
-    console.print(f"[bold]{prompt_text}[/bold]")
-    console.print("[dim]Supports: Tab completion, ~, $HOME, $USER, etc.[/dim]")
-    console.print("[dim]Use ↑/↓ arrow keys to navigate input history.[/dim]")
-    console.print(f"[dim]Press Enter for current directory ({os.getcwd()})[/dim]")
-    console.print()
+    interactive = sys.stdin.isatty()
+    if interactive:
+        # One render pass for the whole banner
+        console.print(
+            f"[bold]{prompt_text}[/bold]\n"
+            "[dim]Supports: Tab completion, ~, $HOME, $USER, etc.[/dim]\n"
+            "[dim]Use ↑/↓ arrow keys to navigate input history.[/dim]\n"
+            f"[dim]Press Enter for current directory ({os.getcwd()})[/dim]\n"
+        )
+    else:
+        sys.stdout.write(f"{prompt_text}\n")
 
     try:
-        # Use raw input to support readline
-        user_input = input(f"Path [{default}]: ").strip()
+        if interactive:
+            # Use raw input to support readline
+            user_input = input(f"Path [{default}]: ").strip()
+        else:
+            # Not interactive: read the line directly, bypassing readline
+            sys.stdout.write(f"Path [{default}]: ")
+            sys.stdout.flush()
+            user_input = sys.stdin.readline().strip()
 
         if not user_input:
             user_input = default
@@ -363,7 +493,93 @@ def show_main_menu() -> str:
         sys.exit(0)
 
 
-def select_github_repository(client: GitHubClient) -> Optional[RepositoryInfo]:
+# Git file status letters -> display color and name
+_STATUS_COLORS = {"A": "green", "M": "yellow", "D": "red", "R": "blue"}
+_STATUS_NAMES = {"A": "added", "M": "modified", "D": "deleted", "R": "renamed"}
+
+# Conventional commit type -> preview badge color
+_TYPE_COLORS = {
+    "feat": "green",
+    "fix": "red",
+    "docs": "blue",
+    "style": "magenta",
+    "refactor": "yellow",
+    "test": "cyan",
+    "chore": "dim",
+    "perf": "green",
+    "ci": "blue",
+    "build": "yellow",
+    "revert": "red",
+}
+
+# Approval prompt answers; single letters expand to the full choice
+_APPROVAL_SHORTCUTS = {
+    "a": "approve",
+    "e": "edit",
+    "r": "regenerate",
+    "c": "cancel",
+}
+_APPROVAL_CHOICES = [*_APPROVAL_SHORTCUTS, *_APPROVAL_SHORTCUTS.values()]
+
+# Tables with more rows than this skip rich's layout engine (see _print_table)
+FAST_TABLE_MIN_ROWS = 10
+
+# Selection table columns: (header, width, justify, style)
+_COMMIT_COLUMNS = (
+    ("#", 3, "right", "dim"),
+    ("SHA", 8, "left", "yellow"),
+    ("Message", 50, "left", None),
+    ("Author", 15, "left", None),
+    ("Date", 12, "left", None),
+)
+
+
+@lru_cache(maxsize=None)
+def _repo_columns(name_header: str) -> tuple:
+    """Columns of a repository/project selection table (built once per header)."""
+    return (
+        ("#", 4, "right", "dim"),
+        (name_header, 40, "left", None),
+        ("Language", 12, "left", None),
+        ("Stars", 6, "right", None),
+        ("Updated", 12, "left", None),
+    )
+
+
+def _print_table(columns: tuple, rows: List[tuple], title: Optional[str] = None):
+    """
+    Print a selection table.
+
+    Small tables are rendered with rich. Larger ones are formatted as
+    fixed-width plain text and printed in one call, skipping rich's column
+    layout pass and per-cell styling.
+
+    Args:
+        columns: (header, width, justify, style) for each column.
+        rows: Plain-text cells for each row.
+        title: Optional table title.
+    """
+    if len(rows) > FAST_TABLE_MIN_ROWS:
+        lines = [title] if title else []
+        for cells in [[header for header, _, _, _ in columns], *rows]:
+            # Same spacing as the rich table's (0, 1) cell padding
+            lines.append(" " + "  ".join(
+                cell[:width].rjust(width) if justify == "right" else cell[:width].ljust(width)
+                for cell, (_, width, justify, _) in zip(cells, columns)
+            ).rstrip())
+        console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
+        return
+
+    table = Table(title=title, box=None, padding=(0, 1))
+    for header, width, justify, style in columns:
+        table.add_column(header, justify=justify, width=width, style=style)
+    for cells in rows:
+        # Text cells: commit messages and names are data, not markup
+        table.add_row(*(Text(cell) for cell in cells))
+    console.print(table)
+
+
+def select_github_repository(client: "GitHubClient") -> Optional["GitHubRepoInfo"]:
     """
     Interactive repository selection from GitHub.
 
@@ -373,6 +589,8 @@ def select_github_repository(client: GitHubClient) -> Optional[RepositoryInfo]:
     Returns:
         Selected RepositoryInfo or None if cancelled.
     """
+    from .github_client import GitHubClientError
+
     with console.status("[cyan]Fetching repositories from GitHub...[/cyan]"):
         try:
             repos = client.list_repositories()
@@ -388,25 +606,19 @@ def select_github_repository(client: GitHubClient) -> Optional[RepositoryInfo]:
     console.print()
 
     # Display repository table
-    table = Table(title="Your Repositories", box=None, padding=(0, 1))
-    table.add_column("#", justify="right", width=4, style="dim")
-    table.add_column("Repository", width=40)
-    table.add_column("Language", width=12)
-    table.add_column("Stars", justify="right", width=6)
-    table.add_column("Updated", width=12)
-
-    for i, repo in enumerate(repos[:30], 1):
-        visibility = "[dim](private)[/dim]" if repo.private else ""
+    rows = []
+    for i, repo in enumerate(islice(repos, 30), 1):
+        visibility = " (private)" if repo.private else ""
         updated = repo.updated_at.strftime("%Y-%m-%d") if repo.updated_at else "N/A"
-        table.add_row(
+        rows.append((
             str(i),
-            f"{repo.full_name} {visibility}",
+            f"{repo.full_name}{visibility}",
             repo.language or "-",
             str(repo.stars),
             updated,
-        )
+        ))
 
-    console.print(table)
+    _print_table(_repo_columns("Repository"), rows, title="Your Repositories")
 
     if len(repos) > 30:
         console.print(f"[dim]Showing first 30 of {len(repos)} repositories.[/dim]")
@@ -432,7 +644,7 @@ def select_github_repository(client: GitHubClient) -> Optional[RepositoryInfo]:
                 return matches[0]
             elif len(matches) > 1:
                 console.print(f"[yellow]Multiple matches found:[/yellow]")
-                for i, repo in enumerate(matches[:10], 1):
+                for i, repo in enumerate(islice(matches, 10), 1):
                     console.print(f"  [{i}] {repo.full_name}")
                 sub_choice = Prompt.ask("Select number", default="1")
                 idx = int(sub_choice) - 1
@@ -446,7 +658,21 @@ def select_github_repository(client: GitHubClient) -> Optional[RepositoryInfo]:
         return None
 
 
-def select_branch(client: GitHubClient, repo_name: str) -> Optional[BranchInfo]:
+def _print_branch_choices(branches: Iterable):
+    """Print numbered branch choices with one console.print call."""
+    lines = []
+    for i, branch in enumerate(branches, 1):
+        indicators = []
+        if branch.is_default:
+            indicators.append("[green]default[/green]")
+        if branch.is_protected:
+            indicators.append("[yellow]protected[/yellow]")
+        indicator_str = f" ({', '.join(indicators)})" if indicators else ""
+        lines.append(f"    [green][{i}][/green] {escape(branch.name)}{indicator_str}")
+    console.print("\n".join(lines))
+
+
+def select_branch(client: "GitHubClient", repo_name: str) -> Optional["GitHubBranchInfo"]:
     """
     Interactive branch selection.
 
@@ -457,6 +683,8 @@ def select_branch(client: GitHubClient, repo_name: str) -> Optional[BranchInfo]:
     Returns:
         Selected BranchInfo or None if cancelled.
     """
+    from .github_client import GitHubClientError
+
     with console.status("[cyan]Fetching branches...[/cyan]"):
         try:
             branches = client.list_branches(repo_name)
@@ -472,14 +700,7 @@ def select_branch(client: GitHubClient, repo_name: str) -> Optional[BranchInfo]:
     console.print("[bold]Select branch:[/bold]")
     console.print()
 
-    for i, branch in enumerate(branches[:20], 1):
-        indicators = []
-        if branch.is_default:
-            indicators.append("[green]default[/green]")
-        if branch.is_protected:
-            indicators.append("[yellow]protected[/yellow]")
-        indicator_str = f" ({', '.join(indicators)})" if indicators else ""
-        console.print(f"    [green][{i}][/green] {branch.name}{indicator_str}")
+    _print_branch_choices(islice(branches, 20))
 
     console.print()
 
@@ -497,9 +718,25 @@ def select_branch(client: GitHubClient, repo_name: str) -> Optional[BranchInfo]:
         return None
 
 
+def _parse_selection(choice: str, items: list) -> list:
+    """
+    Resolve a selection like "1 3-5 7" to the chosen items.
+
+    Numbers are 1-based; ranges are inclusive and clamped to the list, and
+    anything that isn't a number or range is ignored.
+    """
+    selected = []
+    for match in _SELECTION_RE.finditer(choice):
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        for i in range(max(start, 1), min(end, len(items)) + 1):
+            selected.append(items[i - 1])
+    return selected
+
+
 def select_commits(
-    client: GitHubClient, repo_name: str, branch_name: str
-) -> List[CommitInfo]:
+    client: "GitHubClient", repo_name: str, branch_name: str
+) -> List["GitHubCommitInfo"]:
     """
     Interactive commit selection (multi-select).
 
@@ -511,6 +748,8 @@ def select_commits(
     Returns:
         List of selected CommitInfo objects.
     """
+    from .github_client import GitHubClientError
+
     with console.status("[cyan]Fetching commits...[/cyan]"):
         try:
             commits = client.list_commits(repo_name, branch_name, limit=50)
@@ -527,25 +766,19 @@ def select_commits(
     console.print("[dim]Enter numbers separated by spaces, or 'all' for all commits[/dim]")
     console.print()
 
-    table = Table(box=None, padding=(0, 1))
-    table.add_column("#", justify="right", width=3, style="dim")
-    table.add_column("SHA", width=8, style="yellow")
-    table.add_column("Message", width=50)
-    table.add_column("Author", width=15)
-    table.add_column("Date", width=12)
-
-    for i, commit in enumerate(commits[:30], 1):
-        message = commit.message.split("\n")[0][:48]
+    rows = []
+    for i, commit in enumerate(islice(commits, 30), 1):
+        message = commit.message.partition("\n")[0][:48]
         date = commit.date.strftime("%Y-%m-%d") if commit.date else "N/A"
-        table.add_row(
+        rows.append((
             str(i),
             commit.short_sha,
             message,
             commit.author_name[:14],
             date,
-        )
+        ))
 
-    console.print(table)
+    _print_table(_COMMIT_COLUMNS, rows)
     console.print()
 
     try:
@@ -554,21 +787,7 @@ def select_commits(
         if choice.lower() == "all":
             return commits[:30]
 
-        # Parse selection
-        selected = []
-        for part in choice.split():
-            if "-" in part:
-                # Range selection (e.g., "1-5")
-                start, end = part.split("-")
-                for i in range(int(start), int(end) + 1):
-                    if 1 <= i <= len(commits):
-                        selected.append(commits[i - 1])
-            else:
-                idx = int(part) - 1
-                if 0 <= idx < len(commits):
-                    selected.append(commits[idx])
-
-        return selected
+        return _parse_selection(choice, commits)
 
     except (EOFError, KeyboardInterrupt, ValueError):
         return []
@@ -598,15 +817,13 @@ def display_staged_changes(staged: StagedChanges, metrics: ChangeMetrics):
 
     # File list
     console.print("[bold]Changed Files:[/bold]")
-    for f in staged.files[:15]:
-        status_colors = {"A": "green", "M": "yellow", "D": "red", "R": "blue"}
-        status_names = {"A": "added", "M": "modified", "D": "deleted", "R": "renamed"}
-        color = status_colors.get(f.status, "white")
-        status = status_names.get(f.status, f.status)
-        console.print(
-            f"    [{color}]{status:10}[/{color}] {f.file_path} "
-            f"[dim](+{f.additions} -{f.deletions})[/dim]"
-        )
+    # Build the whole listing first and render it in one pass
+    console.print("\n".join(
+        f"    [{_STATUS_COLORS.get(f.status, 'white')}]"
+        f"{_STATUS_NAMES.get(f.status, f.status):10}[/] {escape(f.file_path)} "
+        f"[dim](+{f.additions} -{f.deletions})[/dim]"
+        for f in islice(staged.files, 15)
+    ))
 
     if len(staged.files) > 15:
         console.print(f"    [dim]... and {len(staged.files) - 15} more files[/dim]")
@@ -614,7 +831,7 @@ def display_staged_changes(staged: StagedChanges, metrics: ChangeMetrics):
     console.print()
 
 
-def display_split_proposal(proposal: SplitProposal) -> bool:
+def display_split_proposal(proposal: "SplitProposal") -> bool:
     """
     Display split proposal and get user decision.
 
@@ -663,25 +880,53 @@ def display_split_proposal(proposal: SplitProposal) -> bool:
         return False
 
 
-def display_commit_preview(commit: GeneratedCommit, diff_summary: str):
+def _present_commit(
+    commit: "GeneratedCommit", diff_summary: str, note: str, title: str = "Commit Message"
+):
+    """
+    Show a generated message that is not committed and offer to copy it.
+
+    Args:
+        commit: The generated commit.
+        diff_summary: Summary line for the preview.
+        note: Dim explanation printed under the reference heading.
+        title: Heading of the raw message block.
+    """
+    display_commit_preview(commit, diff_summary)
+
+    console.print()
+    console.print("[bold]Generated message (for reference):[/bold]")
+    console.print(f"[dim]{note}[/dim]")
+    console.print()
+
+    # Display the raw commit message as output
+    heading = f"─── {title} ───"
+    console.print(f"[bold cyan]{heading}[/bold cyan]")
+    console.print()
+    console.print(commit.formatted_message)
+    console.print()
+    console.print(f"[bold cyan]{'─' * len(heading)}[/bold cyan]")
+    console.print()
+
+    # Copy option
+    try:
+        if Confirm.ask("Copy message to clipboard?", default=False):
+            if copy_to_clipboard(commit.formatted_message):
+                show_success("Message copied to clipboard!")
+            else:
+                console.print("[dim]Clipboard not available. Message printed above.[/dim]")
+    except (EOFError, KeyboardInterrupt):
+        pass
+
+
+def display_commit_preview(commit: "GeneratedCommit", diff_summary: str):
     """Display commit message preview."""
+    from rich.syntax import Syntax
+
     console.print()
 
     # Type badge
-    type_colors = {
-        "feat": "green",
-        "fix": "red",
-        "docs": "blue",
-        "style": "magenta",
-        "refactor": "yellow",
-        "test": "cyan",
-        "chore": "dim",
-        "perf": "green",
-        "ci": "blue",
-        "build": "yellow",
-        "revert": "red",
-    }
-    color = type_colors.get(commit.type.type_name, "white")
+    color = _TYPE_COLORS.get(commit.type.type_name, "white")
 
     # Display commit message in panel
     message_display = Syntax(
@@ -720,17 +965,11 @@ def request_user_approval() -> str:
     try:
         choice = Prompt.ask(
             "[bold]Your choice[/bold]",
-            choices=["a", "e", "r", "c", "approve", "edit", "regenerate", "cancel"],
+            choices=_APPROVAL_CHOICES,
             show_choices=False,
         ).lower()
 
-        choice_map = {
-            "a": "approve",
-            "e": "edit",
-            "r": "regenerate",
-            "c": "cancel",
-        }
-        return choice_map.get(choice, choice)
+        return _APPROVAL_SHORTCUTS.get(choice, choice)
 
     except (EOFError, KeyboardInterrupt):
         return "cancel"
@@ -753,19 +992,35 @@ def edit_commit_message(original: str) -> str:
 
     # Show original for reference
     console.print("[dim]Original:[/dim]")
-    for line in original.split("\n"):
-        console.print(f"[dim]> {line}[/dim]")
+    console.print(
+        "\n".join(f"> {escape(line)}" for line in original.splitlines()), style="dim"
+    )
     console.print()
 
+    # Free-form message lines don't need the line editor, tab completion or
+    # the input history, so read them straight from stdin
+    previous_completer = readline.get_completer()
+    readline.set_completer(None)
+    if hasattr(readline, "set_auto_history"):
+        readline.set_auto_history(False)
+
     lines = []
     try:
         while True:
-            line = input()
+            line = sys.stdin.readline()
+            if not line:
+                # EOF
+                return original
+            line = line.rstrip("\n")
             if line.strip().upper() == "END":
                 break
             lines.append(line)
-    except (EOFError, KeyboardInterrupt):
+    except KeyboardInterrupt:
         return original
+    finally:
+        readline.set_completer(previous_completer)
+        if hasattr(readline, "set_auto_history"):
+            readline.set_auto_history(True)
 
     if lines:
         return "\n".join(lines)
@@ -834,8 +1089,43 @@ def select_change_source() -> str:
         return "staged"  # Default to staged
 
 
+def _read_diff(
+    repo_path: str,
+    revs: List[str],
+    command: Tuple[str, ...] = ("diff",),
+    compact: bool = False,
+) -> Tuple[bool, str, List[str]]:
+    """
+    Get a diff and its changed files with a single git invocation.
+
+    Runs ``git diff --numstat -z -p`` once: the NUL-separated numstat records
+    come first (renames carry the old and new path), followed by the patch.
+
+    Args:
+        repo_path: Path to the git repository.
+        revs: Revisions to pass to ``git diff`` (empty for unstaged changes).
+        command: Git subcommand producing the diff.
+        compact: Produce a smaller patch (one context line, histogram diff).
+
+    Returns:
+        Tuple of (success, diff_content, file_paths).
+
+    Raises:
+        subprocess.TimeoutExpired: If git does not finish within 30 seconds.
+    """
+    args = [*command, "--numstat", "-z", "-p", *(COMPACT_DIFF_ARGS if compact else ()), *revs]
+    output = stream_git_output(repo_path, args)
+    if output is None:
+        return False, "", []
+    diff_content, file_paths = parse_numstat_patch(output)
+    return True, diff_content, file_paths
+
+
 def run_local_workflow(config: CommitConfig):
     """Run the local repository commit workflow."""
+    from .commit_generator import CommitGenerator, CommitGeneratorError
+    from .commit_splitter import CommitSplitter
+
     # Prompt for repository path
     repo_path = prompt_for_path("Enter the path to your git repository:")
     console.print()
@@ -858,51 +1148,35 @@ def run_local_workflow(config: CommitConfig):
     console.print(f"[dim]Branch: {git_ops.get_current_branch()}[/dim]")
     console.print()
 
+    # One commit generator serves every change source and the regenerate loop
+    try:
+        generator = CommitGenerator(config)
+    except CommitGeneratorError as e:
+        show_error(str(e))
+        return
+
     # Select change source
     change_source = select_change_source()
     console.print()
 
     # Handle different change sources
-    import subprocess
-
     if change_source == "last_commit":
         # Get diff between HEAD~1 and HEAD
         try:
-            diff_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "HEAD~1", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
+            ok, diff_content, file_paths = _read_diff(
+                repo_path, ["HEAD~1", "HEAD"], compact=config.compact_diff
             )
-            if diff_result.returncode != 0:
+            if not ok:
                 show_error("Failed to get last commit diff. Is there a previous commit?")
                 return
 
-            diff_content = diff_result.stdout
             if not diff_content.strip():
                 show_error("No changes found in last commit.")
                 return
 
-            # Get file list
-            files_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "--name-only", "HEAD~1", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            file_paths = [f.strip() for f in files_result.stdout.strip().split("\n") if f.strip()]
-
-            # Get stats
-            stats_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "--stat", "HEAD~1", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-
             console.print("[bold]Last Commit Changes:[/bold]")
             console.print(f"    Files: {len(file_paths)}")
-            for f in file_paths[:10]:
+            for f in islice(file_paths, 10):
                 console.print(f"    [dim]{f}[/dim]")
             if len(file_paths) > 10:
                 console.print(f"    [dim]... and {len(file_paths) - 10} more files[/dim]")
@@ -916,12 +1190,6 @@ def run_local_workflow(config: CommitConfig):
             return
 
         # Generate commit message for last commit diff
-        try:
-            generator = CommitGenerator(config)
-        except CommitGeneratorError as e:
-            show_error(str(e))
-            return
-
         with console.status("[cyan]Generating commit message with AI...[/cyan]"):
             try:
                 commit = generator.generate_commit_message(
@@ -942,30 +1210,15 @@ def run_local_workflow(config: CommitConfig):
     elif change_source == "unstaged":
         # Get unstaged changes
         try:
-            diff_result = subprocess.run(
-                ["git", "-C", repo_path, "diff"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            diff_content = diff_result.stdout
+            _, diff_content, file_paths = _read_diff(repo_path, [], compact=config.compact_diff)
 
             if not diff_content.strip():
                 show_error("No unstaged changes found.")
                 return
 
-            # Get file list
-            files_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "--name-only"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            file_paths = [f.strip() for f in files_result.stdout.strip().split("\n") if f.strip()]
-
             console.print("[bold]Unstaged Changes:[/bold]")
             console.print(f"    Files: {len(file_paths)}")
-            for f in file_paths[:10]:
+            for f in islice(file_paths, 10):
                 console.print(f"    [yellow]modified:[/yellow] {f}")
             if len(file_paths) > 10:
                 console.print(f"    [dim]... and {len(file_paths) - 10} more files[/dim]")
@@ -979,12 +1232,6 @@ def run_local_workflow(config: CommitConfig):
             return
 
         # Generate commit message
-        try:
-            generator = CommitGenerator(config)
-        except CommitGeneratorError as e:
-            show_error(str(e))
-            return
-
         with console.status("[cyan]Generating commit message with AI...[/cyan]"):
             try:
                 commit = generator.generate_commit_message(
@@ -1005,30 +1252,17 @@ def run_local_workflow(config: CommitConfig):
     elif change_source == "all":
         # Get all changes (staged + unstaged)
         try:
-            diff_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
+            _, diff_content, file_paths = _read_diff(
+                repo_path, ["HEAD"], compact=config.compact_diff
             )
-            diff_content = diff_result.stdout
 
             if not diff_content.strip():
                 show_error("No changes found (staged or unstaged).")
                 return
 
-            # Get file list
-            files_result = subprocess.run(
-                ["git", "-C", repo_path, "diff", "--name-only", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            file_paths = [f.strip() for f in files_result.stdout.strip().split("\n") if f.strip()]
-
             console.print("[bold]All Changes (staged + unstaged):[/bold]")
             console.print(f"    Files: {len(file_paths)}")
-            for f in file_paths[:10]:
+            for f in islice(file_paths, 10):
                 console.print(f"    [dim]{f}[/dim]")
             if len(file_paths) > 10:
                 console.print(f"    [dim]... and {len(file_paths) - 10} more files[/dim]")
@@ -1042,12 +1276,6 @@ def run_local_workflow(config: CommitConfig):
             return
 
         # Generate commit message
-        try:
-            generator = CommitGenerator(config)
-        except CommitGeneratorError as e:
-            show_error(str(e))
-            return
-
         with console.status("[cyan]Generating commit message with AI...[/cyan]"):
             try:
                 commit = generator.generate_commit_message(
@@ -1079,9 +1307,9 @@ def run_local_workflow(config: CommitConfig):
         if unstaged or untracked:
             console.print()
             console.print("[bold]Uncommitted changes:[/bold]")
-            for f in unstaged[:10]:
+            for f in islice(unstaged, 10):
                 console.print(f"    [yellow]modified:[/yellow] {f}")
-            for f in untracked[:10]:
+            for f in islice(untracked, 10):
                 console.print(f"    [green]untracked:[/green] {f}")
             if len(unstaged) + len(untracked) > 20:
                 console.print(f"    [dim]... and more[/dim]")
@@ -1112,13 +1340,6 @@ def run_local_workflow(config: CommitConfig):
             )
             console.print()
 
-    # Initialize commit generator
-    try:
-        generator = CommitGenerator(config)
-    except CommitGeneratorError as e:
-        show_error(str(e))
-        return
-
     # Generate commit message(s)
     if groups_to_process:
         # Generate messages for each group
@@ -1142,23 +1363,33 @@ def run_local_workflow(config: CommitConfig):
         # Generate single commit message
         file_paths = [f.file_path for f in staged.files]
 
-        with console.status("[cyan]Generating commit message with AI...[/cyan]"):
-            try:
-                commit = generator.generate_commit_message(
-                    diff_content=staged.diff_content,
-                    file_paths=file_paths,
-                )
-            except CommitGeneratorError as e:
-                show_error(f"Failed to generate commit message: {e}")
-                return
+        # Tiny docs/test/config edits don't need a round-trip to the API
+        commit = None
+        if len(staged.files) == 1:
+            commit = generator.generate_trivial_commit(staged.files[0])
+
+        if commit is None:
+            with console.status("[cyan]Generating commit message with AI...[/cyan]"):
+                try:
+                    commit = generator.generate_commit_message(
+                        diff_content=staged.diff_content,
+                        file_paths=file_paths,
+                    )
+                except CommitGeneratorError as e:
+                    show_error(f"Failed to generate commit message: {e}")
+                    return
 
         diff_summary = (
             f"Files: {metrics.total_files} | "
             f"Changes: +{staged.total_additions} -{staged.total_deletions}"
         )
 
+        # Only re-render the preview when the message actually changed
+        show_preview = True
         while True:
-            display_commit_preview(commit, diff_summary)
+            if show_preview:
+                display_commit_preview(commit, diff_summary)
+            show_preview = True
 
             choice = request_user_approval()
 
@@ -1173,6 +1404,10 @@ def run_local_workflow(config: CommitConfig):
 
             elif choice == "edit":
                 edited = edit_commit_message(commit.formatted_message)
+                if edited == commit.formatted_message:
+                    # Unchanged (or cancelled): the original was just echoed
+                    show_preview = False
+                    continue
                 # Update the commit object
                 commit.formatted_message = edited
                 # Re-display for final approval
@@ -1194,10 +1429,12 @@ def run_local_workflow(config: CommitConfig):
                             )
                         else:
                             commit = generator.generate_commit_message(
-                                staged.diff_content, file_paths
+                                staged.diff_content, file_paths, use_cache=False
                             )
                     except CommitGeneratorError as e:
                         show_error(f"Regeneration failed: {e}")
+                        # The previous message is still on screen
+                        show_preview = False
                         continue
                 continue
 
@@ -1207,8 +1444,46 @@ def run_local_workflow(config: CommitConfig):
                 break
 
 
+def _aggregate_diffs(diffs: Iterable) -> Tuple[int, int, dict]:
+    """
+    Total the line counts and collect the changed files of several commit diffs.
+
+    Args:
+        diffs: Commit diffs with additions, deletions and files.
+
+    Returns:
+        Tuple of (total_additions, total_deletions, unique_files), where
+        unique_files is an ordered dict of file names (values unused) so the
+        prompt's file list stays deterministic.
+    """
+    total_additions = 0
+    total_deletions = 0
+    unique_files = {}
+    for diff in diffs:
+        total_additions += diff.additions
+        total_deletions += diff.deletions
+        for f in diff.files:
+            unique_files[f["filename"]] = None
+    return total_additions, total_deletions, unique_files
+
+
+def _iter_patches(diffs: Iterable) -> Iterator[str]:
+    """Yield the patches of several commit diffs separated by blank lines."""
+    for i, diff in enumerate(diffs):
+        if i:
+            yield "\n\n"
+        yield diff.patch
+
+
 def run_github_workflow(config: CommitConfig):
     """Run the GitHub repository workflow."""
+    from .commit_generator import CommitGenerator, CommitGeneratorError
+    from .github_client import AuthenticationError as GitHubAuthError
+    from .github_client import (
+        GitHubClient,
+        GitHubClientError,
+    )
+
     # Validate GitHub config
     is_valid, errors = config.validate_github()
     if not is_valid:
@@ -1263,20 +1538,11 @@ def run_github_workflow(config: CommitConfig):
             return
 
     # Aggregate diff content
-    total_additions = sum(d.additions for d in diffs)
-    total_deletions = sum(d.deletions for d in diffs)
-    all_files = []
-    all_patches = []
-
-    for diff in diffs:
-        all_files.extend(f["filename"] for f in diff.files)
-        all_patches.append(diff.patch)
-
-    combined_diff = "\n\n".join(all_patches)
+    total_additions, total_deletions, unique_files = _aggregate_diffs(diffs)
 
     console.print()
     console.print("[bold]Aggregated Changes:[/bold]")
-    console.print(f"    Files: {len(set(all_files))}")
+    console.print(f"    Files: {len(unique_files)}")
     console.print(f"    Lines: [green]+{total_additions}[/green] [red]-{total_deletions}[/red]")
     console.print()
 
@@ -1295,8 +1561,8 @@ def run_github_workflow(config: CommitConfig):
                 "language": repo.language,
             }
             commit = generator.generate_commit_message(
-                diff_content=combined_diff,
-                file_paths=list(set(all_files)),
+                diff_content=_iter_patches(diffs),
+                file_paths=list(unique_files),
                 context=context,
             )
         except CommitGeneratorError as e:
@@ -1305,44 +1571,16 @@ def run_github_workflow(config: CommitConfig):
 
     diff_summary = (
         f"Based on {len(commits)} commit(s) | "
-        f"Files: {len(set(all_files))} | "
+        f"Files: {len(unique_files)} | "
         f"Changes: +{total_additions} -{total_deletions}"
     )
 
-    display_commit_preview(commit, diff_summary)
+    _present_commit(
+        commit, diff_summary, "This message is based on the selected GitHub commits."
+    )
 
-    console.print()
-    console.print("[bold]Generated message (for reference):[/bold]")
-    console.print("[dim]This message is based on the selected GitHub commits.[/dim]")
-    console.print()
 
-    # Display the raw commit message as output
-    console.print("[bold cyan]─── Commit Message ───[/bold cyan]")
-    console.print()
-    console.print(commit.formatted_message)
-    console.print()
-    console.print("[bold cyan]──────────────────────[/bold cyan]")
-    console.print()
-
-    # Copy option
-    try:
-        if Confirm.ask("Copy message to clipboard?", default=False):
-            try:
-                import subprocess
-                # Try xclip (Linux)
-                process = subprocess.Popen(
-                    ["xclip", "-selection", "clipboard"],
-                    stdin=subprocess.PIPE,
-                )
-                process.communicate(commit.formatted_message.encode())
-                show_success("Message copied to clipboard!")
-            except (FileNotFoundError, Exception):
-                console.print("[dim]Clipboard not available. Message printed above.[/dim]")
-    except (EOFError, KeyboardInterrupt):
-        pass
-
-
-def select_gitlab_repository(client: GitLabClient) -> Optional[GitLabRepoInfo]:
+def select_gitlab_repository(client: "GitLabClient") -> Optional["GitLabRepoInfo"]:
     """
     Interactive repository selection from GitLab.
 
@@ -1352,6 +1590,8 @@ def select_gitlab_repository(client: GitLabClient) -> Optional[GitLabRepoInfo]:
     Returns:
         Selected RepositoryInfo or None if cancelled.
     """
+    from .gitlab_client import GitLabClientError
+
     with console.status("[cyan]Fetching projects from GitLab...[/cyan]"):
         try:
             repos = client.list_repositories()
@@ -1367,25 +1607,19 @@ def select_gitlab_repository(client: GitLabClient) -> Optional[GitLabRepoInfo]:
     console.print()
 
     # Display repository table
-    table = Table(title="Your GitLab Projects", box=None, padding=(0, 1))
-    table.add_column("#", justify="right", width=4, style="dim")
-    table.add_column("Project", width=40)
-    table.add_column("Language", width=12)
-    table.add_column("Stars", justify="right", width=6)
-    table.add_column("Updated", width=12)
-
-    for i, repo in enumerate(repos[:30], 1):
-        visibility = "[dim](private)[/dim]" if repo.private else ""
+    rows = []
+    for i, repo in enumerate(islice(repos, 30), 1):
+        visibility = " (private)" if repo.private else ""
         updated = repo.updated_at.strftime("%Y-%m-%d") if repo.updated_at else "N/A"
-        table.add_row(
+        rows.append((
             str(i),
-            f"{repo.full_name} {visibility}",
+            f"{repo.full_name}{visibility}",
             repo.language or "-",
             str(repo.stars),
             updated,
-        )
+        ))
 
-    console.print(table)
+    _print_table(_repo_columns("Project"), rows, title="Your GitLab Projects")
 
     if len(repos) > 30:
         console.print(f"[dim]Showing first 30 of {len(repos)} projects.[/dim]")
@@ -1410,7 +1644,7 @@ def select_gitlab_repository(client: GitLabClient) -> Optional[GitLabRepoInfo]:
                 return matches[0]
             elif len(matches) > 1:
                 console.print(f"[yellow]Multiple matches found:[/yellow]")
-                for i, repo in enumerate(matches[:10], 1):
+                for i, repo in enumerate(islice(matches, 10), 1):
                     console.print(f"  [{i}] {repo.full_name}")
                 sub_choice = Prompt.ask("Select number", default="1")
                 idx = int(sub_choice) - 1
@@ -1424,7 +1658,7 @@ def select_gitlab_repository(client: GitLabClient) -> Optional[GitLabRepoInfo]:
         return None
 
 
-def select_gitlab_branch(client: GitLabClient, project_id: int, default_branch: str) -> Optional[GitLabBranchInfo]:
+def select_gitlab_branch(client: "GitLabClient", project_id: int, default_branch: str) -> Optional["GitLabBranchInfo"]:
     """
     Interactive branch selection for GitLab.
 
@@ -1436,6 +1670,8 @@ def select_gitlab_branch(client: GitLabClient, project_id: int, default_branch:
     Returns:
         Selected BranchInfo or None if cancelled.
     """
+    from .gitlab_client import GitLabClientError
+
     with console.status("[cyan]Fetching branches...[/cyan]"):
         try:
             branches = client.list_branches(project_id)
@@ -1451,14 +1687,7 @@ def select_gitlab_branch(client: GitLabClient, project_id: int, default_branch:
     console.print("[bold]Select branch:[/bold]")
     console.print()
 
-    for i, branch in enumerate(branches[:20], 1):
-        indicators = []
-        if branch.is_default:
-            indicators.append("[green]default[/green]")
-        if branch.is_protected:
-            indicators.append("[yellow]protected[/yellow]")
-        indicator_str = f" ({', '.join(indicators)})" if indicators else ""
-        console.print(f"    [green][{i}][/green] {branch.name}{indicator_str}")
+    _print_branch_choices(islice(branches, 20))
 
     console.print()
 
@@ -1477,8 +1706,8 @@ def select_gitlab_branch(client: GitLabClient, project_id: int, default_branch:
 
 
 def select_gitlab_commits(
-    client: GitLabClient, project_id: int, branch_name: str
-) -> List[GitLabCommitInfo]:
+    client: "GitLabClient", project_id: int, branch_name: str
+) -> List["GitLabCommitInfo"]:
     """
     Interactive commit selection for GitLab (multi-select).
 
@@ -1490,6 +1719,8 @@ def select_gitlab_commits(
     Returns:
         List of selected CommitInfo objects.
     """
+    from .gitlab_client import GitLabClientError
+
     with console.status("[cyan]Fetching commits...[/cyan]"):
         try:
             commits = client.list_commits(project_id, branch_name, limit=50)
@@ -1506,25 +1737,19 @@ def select_gitlab_commits(
     console.print("[dim]Enter numbers separated by spaces, or 'all' for all commits[/dim]")
     console.print()
 
-    table = Table(box=None, padding=(0, 1))
-    table.add_column("#", justify="right", width=3, style="dim")
-    table.add_column("SHA", width=8, style="yellow")
-    table.add_column("Message", width=50)
-    table.add_column("Author", width=15)
-    table.add_column("Date", width=12)
-
-    for i, commit in enumerate(commits[:30], 1):
-        message = commit.message.split("\n")[0][:48]
+    rows = []
+    for i, commit in enumerate(islice(commits, 30), 1):
+        message = commit.message.partition("\n")[0][:48]
         date = commit.date.strftime("%Y-%m-%d") if commit.date else "N/A"
-        table.add_row(
+        rows.append((
             str(i),
             commit.short_sha,
             message,
             commit.author_name[:14],
             date,
-        )
+        ))
 
-    console.print(table)
+    _print_table(_COMMIT_COLUMNS, rows)
     console.print()
 
     try:
@@ -1533,26 +1758,32 @@ def select_gitlab_commits(
         if choice.lower() == "all":
             return commits[:30]
 
-        # Parse selection
-        selected = []
-        for part in choice.split():
-            if "-" in part:
-                # Range selection (e.g., "1-5")
-                start, end = part.split("-")
-                for i in range(int(start), int(end) + 1):
-                    if 1 <= i <= len(commits):
-                        selected.append(commits[i - 1])
-            else:
-                idx = int(part) - 1
-                if 0 <= idx < len(commits):
-                    selected.append(commits[idx])
-
-        return selected
+        return _parse_selection(choice, commits)
 
     except (EOFError, KeyboardInterrupt, ValueError):
         return []
 
 
+def _prepare_quick_generator(config: CommitConfig):
+    """
+    Build the commit generator and check its API key through its client.
+
+    Only OpenAI is checked, since the generator uses no other provider.
+    Going through the generator's own client leaves a warm connection to
+    api.openai.com for the chat completion that follows.
+
+    Returns:
+        Tuple of (CommitGenerator, validate_all_providers() result).
+    """
+    from .commit_generator import CommitGenerator
+
+    generator = CommitGenerator(config)
+    key_status = validate_all_providers(
+        config, openai_client=generator.client, providers=["openai"]
+    )
+    return generator, key_status
+
+
 def run_quick_commit(config: CommitConfig):
     """
     Run a quick, non-interactive commit workflow.
@@ -1560,6 +1791,11 @@ def run_quick_commit(config: CommitConfig):
     Auto-detects the current repository, generates a commit message,
     and creates the commit with minimal user interaction.
     """
+    from .commit_generator import CommitGeneratorError
+
+    # Set up the AI client and check the keys while the repository is read
+    warm_up = _run_in_background(_prepare_quick_generator, config)
+
     # Initialize git operations for current directory
     try:
         git_ops = GitOperations()
@@ -1584,9 +1820,9 @@ def run_quick_commit(config: CommitConfig):
         if unstaged or untracked:
             console.print()
             console.print("[bold]Uncommitted changes detected:[/bold]")
-            for f in unstaged[:5]:
+            for f in islice(unstaged, 5):
                 console.print(f"    [yellow]modified:[/yellow] {f}")
-            for f in untracked[:5]:
+            for f in islice(untracked, 5):
                 console.print(f"    [green]untracked:[/green] {f}")
             if len(unstaged) + len(untracked) > 10:
                 console.print(f"    [dim]... and more[/dim]")
@@ -1603,13 +1839,18 @@ def run_quick_commit(config: CommitConfig):
                   f"[green]+{staged.total_additions}[/green] [red]-{staged.total_deletions}[/red] lines")
     console.print()
 
-    # Initialize commit generator
+    # Initialize commit generator (started in the background above)
     try:
-        generator = CommitGenerator(config)
+        generator, key_status = warm_up.result()
     except CommitGeneratorError as e:
         show_error(str(e))
         return False
 
+    # Only a rejected key stops here; a check without an answer is ignored
+    if key_status.get("openai") is False:
+        show_error("OpenAI rejected the API key. Check OPENAI_API_KEY in your .env file.")
+        return False
+
     # Generate commit message
     file_paths = [f.file_path for f in staged.files]
 
@@ -1657,116 +1898,211 @@ def run_quick_commit(config: CommitConfig):
         return False
 
 
-def fetch_openai_credits(api_key: str) -> Optional[dict]:
+def _check_key(http, method: str, url: str, headers: dict) -> Optional[bool]:
+    """Send an auth-only request: True if accepted, False on 401, None if unknown."""
+    try:
+        response = http.request(method, url, headers=headers, timeout=KEY_CHECK_TIMEOUT)
+    except Exception:
+        return None
+    if response.status_code == 401:
+        return False
+    return True if response.status_code < 400 else None
+
+
+def _check_openai_client(client) -> Optional[bool]:
+    """Like _check_key, but listing models through an OpenAI SDK client."""
+    from openai import AuthenticationError
+
+    try:
+        client.with_options(timeout=KEY_CHECK_TIMEOUT, max_retries=0).models.list()
+    except AuthenticationError:
+        return False
+    except Exception:
+        return None
+    return True
+
+
+def validate_all_providers(
+    config: CommitConfig, openai_client=None, providers: Optional[List[str]] = None
+) -> Dict[str, Optional[bool]]:
     """
-    Fetch OpenAI account credit/balance information.
+    Check every configured provider API key concurrently.
 
     Args:
-        api_key: OpenAI API key.
+        config: Application configuration.
+        openai_client: Optional OpenAI SDK client to check the OpenAI key
+            with, so its connection pool is warmed for later requests.
+        providers: Provider keys to check; all of them when omitted.
+
+    Returns:
+        Provider key -> True (accepted), False (rejected) or None (no answer
+        within KEY_CHECK_TIMEOUT); providers without a key are left out.
+    """
+    checks = {
+        "openai": (
+            config.openai_api_key,
+            "HEAD",
+            "https://api.openai.com/v1/models",
+        ),
+        "deepseek": (
+            os.getenv("DEEPSEEK_API_KEY"),
+            "GET",
+            "https://api.deepseek.com/models",
+        ),
+    }
+    configured = {
+        key: check for key, check in checks.items()
+        if check[0] and (providers is None or key in providers)
+    }
+    if not configured:
+        return {}
+
+    def run_check(item) -> Optional[bool]:
+        provider, (api_key, method, url) = item
+        if provider == "openai" and openai_client is not None:
+            return _check_openai_client(openai_client)
+        return _check_key(session, method, url, {"Authorization": f"Bearer {api_key}"})
+
+    session = _create_http_session()
+    try:
+        with ThreadPoolExecutor(max_workers=len(configured)) as pool:
+            return dict(zip(configured, pool.map(run_check, configured.items())))
+    finally:
+        session.close()
+
+
+def _run_in_background(fn, *args) -> Future:
+    """
+    Call fn(*args) in a daemon thread.
+
+    Unlike an executor's worker, the thread is not joined at exit, so a
+    caller that returns early never waits for it.
 
     Returns:
-        Dictionary with credit information or None if failed.
+        Future resolved with the result or exception of the call.
     """
+    future = Future()
+
+    def _run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+
+def _create_http_session():
+    """Create a requests session whose connections are reused across probes."""
     import requests
-    from datetime import datetime, timedelta
+    from requests.adapters import HTTPAdapter
 
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+
+def _get_json(http, url: str, headers: dict) -> Optional[dict]:
+    """GET a URL and return its JSON body, or None unless the status is 200."""
     try:
-        headers = {"Authorization": f"Bearer {api_key}"}
+        response = http.get(url, headers=headers, timeout=CREDITS_TIMEOUT)
+        if response.status_code == 200:
+            return response.json()
+    except Exception:
+        pass
+    return None
 
-        # First verify the API key works
-        test_response = requests.get(
-            "https://api.openai.com/v1/models",
-            headers=headers,
-            timeout=10,
-        )
 
-        if test_response.status_code != 200:
-            return None
+def fetch_openai_credits(api_key: str, session=None) -> Optional[dict]:
+    """
+    Fetch OpenAI account credit/balance information.
+
+    Args:
+        api_key: OpenAI API key.
+        session: Optional requests session to reuse connections from;
+            a new one is created when omitted.
+
+    Returns:
+        Dictionary with credit information, an empty dict if OpenAI rejected
+        the key, or None if it could not be reached.
+    """
+    http = session or _create_http_session()
+
+    try:
+        headers = {"Authorization": f"Bearer {api_key}"}
 
         # Calculate date range (last 30 days for usage)
         now = datetime.now()
         end_date = (now + timedelta(days=1)).strftime("%Y-%m-%d")
         start_date = (now - timedelta(days=30)).strftime("%Y-%m-%d")
 
-        # Try multiple billing endpoints in order of likelihood to work
-
-        # 1. Try /v1/dashboard/billing/subscription (works with some keys)
-        try:
-            sub_response = requests.get(
-                "https://api.openai.com/v1/dashboard/billing/subscription",
+        # Query every billing endpoint at once; which ones answer depends on the
+        # key type, and the results are checked below in order of preference
+        urls = (
+            "https://api.openai.com/v1/dashboard/billing/subscription",
+            "https://api.openai.com/v1/dashboard/billing/usage"
+            f"?start_date={start_date}&end_date={end_date}",
+            "https://api.openai.com/dashboard/billing/credit_grants",
+            "https://api.openai.com/v1/organization/subscription",
+        )
+        with ThreadPoolExecutor(max_workers=len(urls) + 1) as pool:
+            # Billing endpoints reject some valid keys, so the key itself is
+            # checked with a body-less HEAD alongside them
+            key_check = pool.submit(
+                http.head,
+                "https://api.openai.com/v1/models",
                 headers=headers,
-                timeout=10,
+                timeout=CREDITS_TIMEOUT,
             )
-            if sub_response.status_code == 200:
-                sub_data = sub_response.json()
-                hard_limit = sub_data.get("hard_limit_usd", 0)
-
-                # Get usage
-                usage_response = requests.get(
-                    f"https://api.openai.com/v1/dashboard/billing/usage?start_date={start_date}&end_date={end_date}",
-                    headers=headers,
-                    timeout=10,
-                )
-                total_used = 0
-                if usage_response.status_code == 200:
-                    usage_data = usage_response.json()
-                    total_used = usage_data.get("total_usage", 0) / 100  # cents to dollars
+            sub_data, usage_data, credits_data, org_data = pool.map(
+                lambda url: _get_json(http, url, headers), urls
+            )
+            if key_check.result().status_code == 401:
+                return {}
 
-                remaining = hard_limit - total_used if hard_limit else None
-                return {
-                    "provider": "OpenAI",
-                    "total_granted": hard_limit,
-                    "total_used": total_used,
-                    "remaining": remaining,
-                    "plan": sub_data.get("plan", {}).get("title", "API Active"),
-                    "status": "active",
-                }
-        except Exception:
-            pass
+        # 1. /v1/dashboard/billing/subscription (works with some keys)
+        if sub_data is not None:
+            hard_limit = sub_data.get("hard_limit_usd", 0)
+            total_used = 0
+            if usage_data is not None:
+                total_used = usage_data.get("total_usage", 0) / 100  # cents to dollars
 
-        # 2. Try /dashboard/billing/credit_grants (for prepaid credits)
-        try:
-            credits_response = requests.get(
-                "https://api.openai.com/dashboard/billing/credit_grants",
-                headers=headers,
-                timeout=10,
-            )
-            if credits_response.status_code == 200:
-                credits_data = credits_response.json()
-                total_granted = credits_data.get("total_granted", 0)
-                total_used = credits_data.get("total_used", 0)
-                remaining = credits_data.get("total_available", total_granted - total_used)
-                return {
-                    "provider": "OpenAI",
-                    "total_granted": total_granted,
-                    "total_used": total_used,
-                    "remaining": remaining,
-                    "plan": "Prepaid Credits",
-                    "status": "active",
-                }
-        except Exception:
-            pass
+            remaining = hard_limit - total_used if hard_limit else None
+            return {
+                "provider": "OpenAI",
+                "total_granted": hard_limit,
+                "total_used": total_used,
+                "remaining": remaining,
+                "plan": sub_data.get("plan", {}).get("title", "API Active"),
+                "status": "active",
+            }
 
-        # 3. Try /v1/organization endpoints (for org-level keys)
-        try:
-            org_response = requests.get(
-                "https://api.openai.com/v1/organization/subscription",
-                headers=headers,
-                timeout=10,
-            )
-            if org_response.status_code == 200:
-                org_data = org_response.json()
-                hard_limit = org_data.get("hard_limit_usd", 0)
-                return {
-                    "provider": "OpenAI",
-                    "total_granted": hard_limit,
-                    "total_used": None,
-                    "remaining": hard_limit,
-                    "plan": org_data.get("plan", {}).get("title", "Organization"),
-                    "status": "active",
-                }
-        except Exception:
-            pass
+        # 2. /dashboard/billing/credit_grants (for prepaid credits)
+        if credits_data is not None:
+            total_granted = credits_data.get("total_granted", 0)
+            total_used = credits_data.get("total_used", 0)
+            remaining = credits_data.get("total_available", total_granted - total_used)
+            return {
+                "provider": "OpenAI",
+                "total_granted": total_granted,
+                "total_used": total_used,
+                "remaining": remaining,
+                "plan": "Prepaid Credits",
+                "status": "active",
+            }
+
+        # 3. /v1/organization endpoints (for org-level keys)
+        if org_data is not None:
+            hard_limit = org_data.get("hard_limit_usd", 0)
+            return {
+                "provider": "OpenAI",
+                "total_granted": hard_limit,
+                "total_used": None,
+                "remaining": hard_limit,
+                "plan": org_data.get("plan", {}).get("title", "Organization"),
+                "status": "active",
+            }
 
         # 4. For project API keys, billing access is restricted
         # Return active status without balance
@@ -1783,17 +2119,20 @@ def fetch_openai_credits(api_key: str) -> Optional[dict]:
         return None
 
 
-def fetch_anthropic_credits(api_key: str) -> Optional[dict]:
+def fetch_anthropic_credits(api_key: str, session=None) -> Optional[dict]:
     """
     Fetch Anthropic (Claude) account credit/balance information.
 
     Args:
         api_key: Anthropic API key.
+        session: Optional requests session to reuse connections from;
+            a new one is created when omitted.
 
     Returns:
-        Dictionary with credit information or None if failed.
+        Dictionary with credit information, an empty dict if Anthropic
+        rejected the key, or None if it could not be reached.
     """
-    import requests
+    http = session or _create_http_session()
 
     try:
         headers = {
@@ -1802,10 +2141,10 @@ def fetch_anthropic_credits(api_key: str) -> Optional[dict]:
         }
 
         # Anthropic doesn't have a public billing API, so we just verify the key
-        response = requests.get(
+        response = http.get(
             "https://api.anthropic.com/v1/messages",
             headers=headers,
-            timeout=10,
+            timeout=CREDITS_TIMEOUT,
         )
 
         # A 405 Method Not Allowed means the key is valid but GET isn't supported
@@ -1820,22 +2159,34 @@ def fetch_anthropic_credits(api_key: str) -> Optional[dict]:
                 "status": "active",
                 "note": "Check console.anthropic.com for usage details",
             }
-        return None
+        return {} if response.status_code == 401 else None
     except Exception:
         return None
 
 
-def fetch_deepseek_credits(api_key: str) -> Optional[dict]:
+def _to_float(value) -> float:
+    """Convert a numeric API value (number or decimal string) to float, else 0.0."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.replace(".", "", 1).lstrip("-").isdigit():
+        return float(value)
+    return 0.0
+
+
+def fetch_deepseek_credits(api_key: str, session=None) -> Optional[dict]:
     """
     Fetch DeepSeek account credit/balance information.
 
     Args:
         api_key: DeepSeek API key.
+        session: Optional requests session to reuse connections from;
+            a new one is created when omitted.
 
     Returns:
-        Dictionary with credit information or None if failed.
+        Dictionary with credit information, an empty dict if DeepSeek
+        rejected the key, or None if it could not be reached.
     """
-    import requests
+    http = session or _create_http_session()
 
     try:
         headers = {
@@ -1843,10 +2194,10 @@ def fetch_deepseek_credits(api_key: str) -> Optional[dict]:
         }
 
         # Get user balance from DeepSeek API
-        response = requests.get(
+        response = http.get(
             "https://api.deepseek.com/user/balance",
             headers=headers,
-            timeout=10,
+            timeout=CREDITS_TIMEOUT,
         )
 
         if response.status_code == 200:
@@ -1854,14 +2205,7 @@ def fetch_deepseek_credits(api_key: str) -> Optional[dict]:
             balance_infos = data.get("balance_infos", [])
 
             # Calculate total balance from all currency balances
-            total_balance = 0.0
-            for balance in balance_infos:
-                # Handle both string and numeric values
-                bal_value = balance.get("total_balance", 0)
-                try:
-                    total_balance += float(bal_value) if bal_value else 0.0
-                except (ValueError, TypeError):
-                    pass
+            total_balance = sum(_to_float(b.get("total_balance")) for b in balance_infos)
 
             # Check if account is available
             is_available = data.get("is_available", True)
@@ -1874,12 +2218,14 @@ def fetch_deepseek_credits(api_key: str) -> Optional[dict]:
                 "plan": "API Active" if is_available else "Inactive",
                 "status": "active" if is_available else "inactive",
             }
+        elif response.status_code == 401:
+            return {}
         else:
             # Try to verify the key with a simple models request
-            test_response = requests.get(
+            test_response = http.get(
                 "https://api.deepseek.com/models",
                 headers=headers,
-                timeout=10,
+                timeout=CREDITS_TIMEOUT,
             )
             if test_response.status_code == 200:
                 return {
@@ -1890,126 +2236,253 @@ def fetch_deepseek_credits(api_key: str) -> Optional[dict]:
                     "plan": "API Key Valid",
                     "status": "active",
                 }
-            return None
+            return {} if test_response.status_code == 401 else None
     except Exception:
         return None
 
 
-def display_ai_credits(config: CommitConfig) -> Optional[str]:
+def _load_credits_cache() -> dict:
+    """Load cached credit lookups, or an empty cache if unreadable."""
+    try:
+        with open(CREDITS_CACHE_FILE, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_credits_cache(cache: dict):
+    """Write cached credit lookups, ignoring errors (the cache is optional)."""
+    try:
+        os.makedirs(os.path.dirname(CREDITS_CACHE_FILE), exist_ok=True)
+        with open(CREDITS_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+def _cached_credits(
+    fetch, provider: str, api_key: str, session, cache: Optional[dict], refresh: bool
+) -> Optional[dict]:
+    """
+    Fetch provider credits through the on-disk TTL cache.
+
+    Args:
+        fetch: fetch_*_credits function to call on a miss.
+        provider: Provider key used in the cache key.
+        api_key: API key to look up.
+        session: Optional requests session passed to fetch.
+        cache: Cache contents from _load_credits_cache(), updated in place.
+            None disables caching.
+        refresh: Ignore fresh entries and always fetch.
+
+    Returns:
+        Credit information, a stale cached copy (at most
+        CREDITS_STALE_MAX_AGE old) if the provider could not be reached,
+        or None.
+    """
+    if cache is None:
+        return fetch(api_key, session)
+
+    key = f"{provider}:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    entry = cache.get(key)
+    if not isinstance(entry, dict) or not isinstance(entry.get("info"), dict):
+        entry = None
+    if entry and not refresh and time.time() - entry.get("ts", 0) <= CREDITS_CACHE_TTL:
+        return entry["info"]
+
+    info = fetch(api_key, session)
+    if info:
+        cache[key] = {"ts": time.time(), "info": info}
+        return info
+    if info is not None:
+        # Key rejected: never show the old lookup again
+        cache.pop(key, None)
+        return None
+
+    if entry and time.time() - entry.get("ts", 0) <= CREDITS_STALE_MAX_AGE:
+        # Provider unreachable: show the last known data
+        stale = dict(entry["info"])
+        note = stale.get("note")
+        stale["note"] = f"{note} (cached, stale)" if note else "(cached, stale)"
+        return stale
+    return None
+
+
+# Menu name and model of each selectable AI provider
+_AI_PROVIDERS = {
+    "openai": ("OpenAI GPT-4 Turbo", "gpt-4-turbo"),
+    "deepseek": ("DeepSeek V3", "deepseek-chat"),
+}
+
+
+def _unavailable_provider(name: str, key: str, status: str, model: str) -> dict:
+    """Provider menu entry for a provider that cannot be selected."""
+    return {
+        "name": name,
+        "key": key,
+        "status": status,
+        "plan": "-",
+        "credit": "[dim]-[/dim]",
+        "credit_value": None,
+        "model": model,
+        "available": False,
+    }
+
+
+def _timed_out_provider(key: str) -> dict:
+    """Provider menu entry for a configured provider whose check did not finish."""
+    name, model = _AI_PROVIDERS[key]
+    return {
+        "name": name,
+        "key": key,
+        "status": "[yellow]Unknown[/yellow]",
+        "plan": "Unknown",
+        "credit": "[dim]N/A[/dim]",
+        "credit_value": None,
+        "model": model,
+        "available": True,
+        "note": f"timeout after {CREDITS_TIMEOUT}s",
+    }
+
+
+def _probe_openai(
+    api_key: Optional[str], session=None, cache: Optional[dict] = None, refresh: bool = False
+) -> dict:
+    """Check the OpenAI key and build its provider menu entry."""
+    name, model = _AI_PROVIDERS["openai"]
+    if not api_key:
+        return _unavailable_provider(name, "openai", "[yellow]Not Configured[/yellow]", "-")
+
+    info = _cached_credits(fetch_openai_credits, "openai", api_key, session, cache, refresh)
+    if not info:
+        return _unavailable_provider(name, "openai", "[red]Invalid Key[/red]", model)
+
+    remaining = info.get("remaining")
+    if remaining is not None:
+        credit_str = f"[green]${remaining:.2f}[/green]"
+    else:
+        credit_str = "[yellow]See dashboard[/yellow]"
+
+    return {
+        "name": name,
+        "key": "openai",
+        "status": "[green]Active[/green]",
+        "plan": info.get("plan", "Unknown"),
+        "credit": credit_str,
+        "credit_value": remaining,
+        "model": model,
+        "available": True,
+        "note": info.get("note"),
+    }
+
+
+def _probe_deepseek(
+    api_key: Optional[str], session=None, cache: Optional[dict] = None, refresh: bool = False
+) -> dict:
+    """Check the DeepSeek key and build its provider menu entry."""
+    name, model = _AI_PROVIDERS["deepseek"]
+    if not api_key:
+        return _unavailable_provider(name, "deepseek", "[yellow]Not Configured[/yellow]", "-")
+
+    info = _cached_credits(fetch_deepseek_credits, "deepseek", api_key, session, cache, refresh)
+    if not info:
+        return _unavailable_provider(name, "deepseek", "[red]Invalid Key[/red]", model)
+
+    remaining = info.get("remaining")
+    if remaining is not None:
+        credit_str = f"[green]${remaining:.2f}[/green]"
+    else:
+        credit_str = "[dim]N/A[/dim]"
+
+    return {
+        "name": name,
+        "key": "deepseek",
+        "status": "[green]Active[/green]",
+        "plan": info.get("plan", "Unknown"),
+        "credit": credit_str,
+        "credit_value": remaining,
+        "model": model,
+        "available": True,
+        "note": info.get("note"),
+    }
+
+
+def display_ai_credits(config: CommitConfig, refresh: bool = False) -> Optional[str]:
     """
     Display available AI providers and their credit balances.
 
     Args:
         config: Application configuration.
+        refresh: Bypass the credits cache and query every provider.
+
+    When stdout is not a terminal the providers are listed as plain text and
+    the first available one is returned without prompting.
 
     Returns:
         Selected provider key or None if cancelled.
     """
-    console.print()
-    console.print(Panel(
-        "[bold]AI PROVIDER CONFIGURATION[/bold]\n"
-        "[dim]Select AI provider and view remaining credits[/dim]",
-        border_style="cyan",
-        padding=(1, 4),
-    ))
-    console.print()
+    interactive = console.is_terminal
+    if interactive:
+        console.print()
+        console.print(Panel(
+            "[bold]AI PROVIDER CONFIGURATION[/bold]\n"
+            "[dim]Select AI provider and view remaining credits[/dim]",
+            border_style="cyan",
+            padding=(1, 4),
+        ))
+        console.print()
 
-    console.print("[bold]Select AI provider:[/bold]")
-    console.print()
+        console.print("[bold]Select AI provider:[/bold]")
+        console.print()
 
-    providers = []
+    # Providers without a key are only named in a footer line, not probed
+    probes = []
+    not_configured = []
+    for key, probe, api_key in (
+        ("openai", _probe_openai, config.openai_api_key),
+        ("deepseek", _probe_deepseek, os.getenv("DEEPSEEK_API_KEY")),
+    ):
+        if api_key:
+            probes.append((key, probe, api_key))
+        else:
+            not_configured.append(_AI_PROVIDERS[key][0])
 
-    # Check OpenAI GPT-4 Turbo
-    if config.openai_api_key:
-        with console.status("[cyan]Checking OpenAI API key...[/cyan]"):
-            openai_info = fetch_openai_credits(config.openai_api_key)
+    cache = _load_credits_cache()
+    cached = json.dumps(cache, sort_keys=True)
 
-        if openai_info:
-            remaining = openai_info.get("remaining")
-            if remaining is not None:
-                credit_str = f"[green]${remaining:.2f}[/green]"
-            else:
-                credit_str = "[yellow]See dashboard[/yellow]"
-
-            providers.append({
-                "name": "OpenAI GPT-4 Turbo",
-                "key": "openai",
-                "status": "[green]Active[/green]",
-                "plan": openai_info.get("plan", "Unknown"),
-                "credit": credit_str,
-                "credit_value": remaining,
-                "model": "gpt-4-turbo",
-                "available": True,
-                "note": openai_info.get("note"),
-            })
-        else:
-            providers.append({
-                "name": "OpenAI GPT-4 Turbo",
-                "key": "openai",
-                "status": "[red]Invalid Key[/red]",
-                "plan": "-",
-                "credit": "[dim]-[/dim]",
-                "credit_value": None,
-                "model": "gpt-4-turbo",
-                "available": False,
-            })
-    else:
-        providers.append({
-            "name": "OpenAI GPT-4 Turbo",
-            "key": "openai",
-            "status": "[yellow]Not Configured[/yellow]",
-            "plan": "-",
-            "credit": "[dim]-[/dim]",
-            "credit_value": None,
-            "model": "-",
-            "available": False,
-        })
-
-    # Check DeepSeek V3
-    deepseek_key = os.getenv("DEEPSEEK_API_KEY")
-    if deepseek_key:
-        with console.status("[cyan]Fetching DeepSeek credits...[/cyan]"):
-            deepseek_info = fetch_deepseek_credits(deepseek_key)
-
-        if deepseek_info:
-            remaining = deepseek_info.get("remaining")
-            if remaining is not None:
-                credit_str = f"[green]${remaining:.2f}[/green]"
-            else:
-                credit_str = "[dim]N/A[/dim]"
-
-            providers.append({
-                "name": "DeepSeek V3",
-                "key": "deepseek",
-                "status": "[green]Active[/green]",
-                "plan": deepseek_info.get("plan", "Unknown"),
-                "credit": credit_str,
-                "credit_value": remaining,
-                "model": "deepseek-chat",
-                "available": True,
-            })
+    # Probe the providers concurrently over one shared session and give up on
+    # any probe still running after CREDITS_TIMEOUT. Each probe fills its own
+    # copy of the cache, so one that finishes late cannot touch the shared one.
+    session = _create_http_session()
+    probe_caches = [dict(cache) for _ in probes]
+    pool = ThreadPoolExecutor(max_workers=max(len(probes), 1))
+    try:
+        with console.status("[cyan]Checking AI provider credits...[/cyan]"):
+            futures = [
+                pool.submit(probe, api_key, session, probe_cache, refresh)
+                for (_, probe, api_key), probe_cache in zip(probes, probe_caches)
+            ]
+            wait(futures, timeout=CREDITS_TIMEOUT)
+    finally:
+        pool.shutdown(wait=False)
+
+    providers = []
+    for (key, _, _), future, probe_cache in zip(probes, futures, probe_caches):
+        if future.done():
+            providers.append(future.result())
+            cache.update(probe_cache)
         else:
-            providers.append({
-                "name": "DeepSeek V3",
-                "key": "deepseek",
-                "status": "[red]Invalid Key[/red]",
-                "plan": "-",
-                "credit": "[dim]-[/dim]",
-                "credit_value": None,
-                "model": "deepseek-chat",
-                "available": False,
-            })
-    else:
-        providers.append({
-            "name": "DeepSeek V3",
-            "key": "deepseek",
-            "status": "[yellow]Not Configured[/yellow]",
-            "plan": "-",
-            "credit": "[dim]-[/dim]",
-            "credit_value": None,
-            "model": "-",
-            "available": False,
-        })
+            providers.append(_timed_out_provider(key))
+    if all(future.done() for future in futures):
+        # Otherwise a late probe still uses the session; it closes when released
+        session.close()
+
+    if json.dumps(cache, sort_keys=True) != cached:
+        _save_credits_cache(cache)
+
+    if not interactive:
+        return _print_ai_credits_plain(providers, not_configured)
 
     # Display provider options with credit info
     for i, provider in enumerate(providers, 1):
@@ -2020,25 +2493,29 @@ def display_ai_credits(config: CommitConfig) -> Optional[str]:
             f"[dim]({provider['status']})[/dim] - Credit: {credit_display}"
         )
 
+    if not_configured:
+        console.print(f"    [dim]Not configured: {', '.join(not_configured)}[/dim]")
+
     console.print()
 
-    # Create table for detailed view
-    table = Table(title="Provider Details", box=None, padding=(0, 2))
-    table.add_column("#", justify="right", width=3, style="dim")
-    table.add_column("Provider", width=20)
-    table.add_column("Status", width=15)
-    table.add_column("Credit Left", width=15, justify="right")
+    if providers:
+        # Create table for detailed view
+        table = Table(title="Provider Details", box=None, padding=(0, 2))
+        table.add_column("#", justify="right", width=3, style="dim")
+        table.add_column("Provider", width=20)
+        table.add_column("Status", width=15)
+        table.add_column("Credit Left", width=15, justify="right")
 
-    for i, provider in enumerate(providers, 1):
-        table.add_row(
-            str(i),
-            provider["name"],
-            provider["status"],
-            provider["credit"],
-        )
+        for i, provider in enumerate(providers, 1):
+            table.add_row(
+                str(i),
+                provider["name"],
+                provider["status"],
+                provider["credit"],
+            )
 
-    console.print(table)
-    console.print()
+        console.print(table)
+        console.print()
 
     # Show notes for providers
     for provider in providers:
@@ -2080,9 +2557,31 @@ def display_ai_credits(config: CommitConfig) -> Optional[str]:
         return None
 
 
-def run_ai_config_workflow(config: CommitConfig):
+def _print_ai_credits_plain(providers: List[dict], not_configured: List[str]) -> Optional[str]:
+    """
+    List providers as tab-separated plain text for non-terminal output.
+
+    Args:
+        providers: Probed provider menu entries.
+        not_configured: Names of providers without an API key.
+
+    Returns:
+        Key of the first available provider, or None.
+    """
+    lines = [
+        "\t".join(Text.from_markup(cell).plain for cell in (
+            provider["name"], provider["status"], provider["credit"]
+        ))
+        for provider in providers
+    ]
+    lines.extend(f"{name}\tNot Configured\t-" for name in not_configured)
+    print("\n".join(lines))
+    return next((p["key"] for p in providers if p["available"]), None)
+
+
+def run_ai_config_workflow(config: CommitConfig, refresh_credits: bool = False):
     """Run the AI configuration workflow."""
-    selected_provider = display_ai_credits(config)
+    selected_provider = display_ai_credits(config, refresh=refresh_credits)
 
     if selected_provider:
         console.print()
@@ -2100,6 +2599,13 @@ def run_ai_config_workflow(config: CommitConfig):
 
 def run_gitlab_workflow(config: CommitConfig):
     """Run the GitLab repository workflow."""
+    from .commit_generator import CommitGenerator, CommitGeneratorError
+    from .gitlab_client import AuthenticationError as GitLabAuthError
+    from .gitlab_client import (
+        GitLabClient,
+        GitLabClientError,
+    )
+
     # Validate GitLab config
     is_valid, errors = config.validate_gitlab()
     if not is_valid:
@@ -2159,20 +2665,11 @@ def run_gitlab_workflow(config: CommitConfig):
             return
 
     # Aggregate diff content
-    total_additions = sum(d.additions for d in diffs)
-    total_deletions = sum(d.deletions for d in diffs)
-    all_files = []
-    all_patches = []
-
-    for diff in diffs:
-        all_files.extend(f["filename"] for f in diff.files)
-        all_patches.append(diff.patch)
-
-    combined_diff = "\n\n".join(all_patches)
+    total_additions, total_deletions, unique_files = _aggregate_diffs(diffs)
 
     console.print()
     console.print("[bold]Aggregated Changes:[/bold]")
-    console.print(f"    Files: {len(set(all_files))}")
+    console.print(f"    Files: {len(unique_files)}")
     console.print(f"    Lines: [green]+{total_additions}[/green] [red]-{total_deletions}[/red]")
     console.print()
 
@@ -2191,8 +2688,8 @@ def run_gitlab_workflow(config: CommitConfig):
                 "language": repo.language,
             }
             commit = generator.generate_commit_message(
-                diff_content=combined_diff,
-                file_paths=list(set(all_files)),
+                diff_content=_iter_patches(diffs),
+                file_paths=list(unique_files),
                 context=context,
             )
         except CommitGeneratorError as e:
@@ -2201,45 +2698,19 @@ def run_gitlab_workflow(config: CommitConfig):
 
     diff_summary = (
         f"Based on {len(commits)} commit(s) | "
-        f"Files: {len(set(all_files))} | "
+        f"Files: {len(unique_files)} | "
         f"Changes: +{total_additions} -{total_deletions}"
     )
 
-    display_commit_preview(commit, diff_summary)
-
-    console.print()
-    console.print("[bold]Generated message (for reference):[/bold]")
-    console.print("[dim]This message is based on the selected GitLab commits.[/dim]")
-    console.print()
-
-    # Display the raw commit message as output
-    console.print("[bold cyan]─── Commit Message ───[/bold cyan]")
-    console.print()
-    console.print(commit.formatted_message)
-    console.print()
-    console.print("[bold cyan]──────────────────────[/bold cyan]")
-    console.print()
-
-    # Copy option
-    try:
-        if Confirm.ask("Copy message to clipboard?", default=False):
-            try:
-                import subprocess
-                # Try xclip (Linux)
-                process = subprocess.Popen(
-                    ["xclip", "-selection", "clipboard"],
-                    stdin=subprocess.PIPE,
-                )
-                process.communicate(commit.formatted_message.encode())
-                show_success("Message copied to clipboard!")
-            except (FileNotFoundError, Exception):
-                console.print("[dim]Clipboard not available. Message printed above.[/dim]")
-    except (EOFError, KeyboardInterrupt):
-        pass
+    _present_commit(
+        commit, diff_summary, "This message is based on the selected GitLab commits."
+    )
 
 
 def run_current_commit_workflow(config: CommitConfig):
     """Run the workflow for analyzing the current (HEAD) commit."""
+    from .commit_generator import CommitGenerator, CommitGeneratorError
+
     # Prompt for repository path
     repo_path = prompt_for_path("Enter the path to your git repository:")
     console.print()
@@ -2267,57 +2738,12 @@ def run_current_commit_workflow(config: CommitConfig):
 
     with console.status("[cyan]Fetching current commit...[/cyan]"):
         try:
-            import subprocess
-            # Get the actual SHA of HEAD
-            sha_result = subprocess.run(
-                ["git", "-C", repo_path, "rev-parse", "HEAD"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if sha_result.returncode != 0:
+            # Get SHA, message, file list and diff in one git call
+            bundle = git_ops.get_commit_bundle(commit_id, compact=config.compact_diff)
+            if bundle is None:
                 show_error("No commits found in repository.")
                 return
-            actual_sha = sha_result.stdout.strip()
-
-            # Get commit info
-            result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--stat", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
-                show_error("Failed to get current commit.")
-                console.print(f"[dim]{result.stderr.strip()}[/dim]")
-                return
-
-            # Get diff content
-            diff_result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--format=", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            diff_content = diff_result.stdout
-
-            # Get file list
-            files_result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--name-only", "--format=", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            file_paths = [f.strip() for f in files_result.stdout.strip().split("\n") if f.strip()]
-
-            # Get commit message
-            msg_result = subprocess.run(
-                ["git", "-C", repo_path, "log", "-1", "--format=%B", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            original_message = msg_result.stdout.strip()
+            actual_sha, original_message, file_paths, diff_content = bundle
 
         except subprocess.TimeoutExpired:
             show_error("Git command timed out.")
@@ -2333,7 +2759,7 @@ def run_current_commit_workflow(config: CommitConfig):
     console.print(Panel(original_message, border_style="dim", padding=(0, 2)))
     console.print()
     console.print(f"[bold]Files Changed:[/bold] {len(file_paths)}")
-    for f in file_paths[:10]:
+    for f in islice(file_paths, 10):
         console.print(f"    [dim]{f}[/dim]")
     if len(file_paths) > 10:
         console.print(f"    [dim]... and {len(file_paths) - 10} more files[/dim]")
@@ -2358,41 +2784,18 @@ def run_current_commit_workflow(config: CommitConfig):
             return
 
     diff_summary = f"Current Commit: {actual_sha[:8]} | Files: {len(file_paths)}"
-    display_commit_preview(commit, diff_summary)
-
-    console.print()
-    console.print("[bold]Generated message (for reference):[/bold]")
-    console.print("[dim]Compare with the original commit message above.[/dim]")
-    console.print()
-
-    # Display the raw commit message as output
-    console.print("[bold cyan]─── Generated Commit Message ───[/bold cyan]")
-    console.print()
-    console.print(commit.formatted_message)
-    console.print()
-    console.print("[bold cyan]────────────────────────────────[/bold cyan]")
-    console.print()
-
-    # Copy option
-    try:
-        if Confirm.ask("Copy message to clipboard?", default=False):
-            try:
-                import subprocess
-                # Try xclip (Linux)
-                process = subprocess.Popen(
-                    ["xclip", "-selection", "clipboard"],
-                    stdin=subprocess.PIPE,
-                )
-                process.communicate(commit.formatted_message.encode())
-                show_success("Message copied to clipboard!")
-            except (FileNotFoundError, Exception):
-                console.print("[dim]Clipboard not available. Message printed above.[/dim]")
-    except (EOFError, KeyboardInterrupt):
-        pass
+    _present_commit(
+        commit,
+        diff_summary,
+        "Compare with the original commit message above.",
+        title="Generated Commit Message",
+    )
 
 
 def run_commit_id_workflow(config: CommitConfig):
     """Run the workflow for analyzing a specific commit by ID."""
+    from .commit_generator import CommitGenerator, CommitGeneratorError
+
     # Prompt for repository path
     repo_path = prompt_for_path("Enter the path to your git repository:")
     console.print()
@@ -2440,53 +2843,12 @@ def run_commit_id_workflow(config: CommitConfig):
     # Get commit diff using git show
     with console.status(f"[cyan]Fetching commit {commit_id[:8]}...[/cyan]"):
         try:
-            import subprocess
-            # Get commit info
-            result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--stat", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
+            # Get message, file list and diff in one git call
+            bundle = git_ops.get_commit_bundle(commit_id, compact=config.compact_diff)
+            if bundle is None:
                 show_error(f"Commit not found: {commit_id}")
-                console.print(f"[dim]{result.stderr.strip()}[/dim]")
                 return
-
-            # Get diff content
-            diff_result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--format=", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            diff_content = diff_result.stdout
-
-            # Get file list
-            files_result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--name-only", "--format=", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            file_paths = [f.strip() for f in files_result.stdout.strip().split("\n") if f.strip()]
-
-            # Get commit message
-            msg_result = subprocess.run(
-                ["git", "-C", repo_path, "log", "-1", "--format=%B", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            original_message = msg_result.stdout.strip()
-
-            # Get stats
-            stats_result = subprocess.run(
-                ["git", "-C", repo_path, "show", "--stat", "--format=", commit_id],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+            _, original_message, file_paths, diff_content = bundle
 
         except subprocess.TimeoutExpired:
             show_error("Git command timed out.")
@@ -2502,7 +2864,7 @@ def run_commit_id_workflow(config: CommitConfig):
     console.print(Panel(original_message, border_style="dim", padding=(0, 2)))
     console.print()
     console.print(f"[bold]Files Changed:[/bold] {len(file_paths)}")
-    for f in file_paths[:10]:
+    for f in islice(file_paths, 10):
         console.print(f"    [dim]{f}[/dim]")
     if len(file_paths) > 10:
         console.print(f"    [dim]... and {len(file_paths) - 10} more files[/dim]")
@@ -2527,37 +2889,26 @@ def run_commit_id_workflow(config: CommitConfig):
             return
 
     diff_summary = f"Commit: {commit_id[:8]} | Files: {len(file_paths)}"
-    display_commit_preview(commit, diff_summary)
+    _present_commit(
+        commit,
+        diff_summary,
+        "Compare with the original commit message above.",
+        title="Generated Commit Message",
+    )
 
-    console.print()
-    console.print("[bold]Generated message (for reference):[/bold]")
-    console.print("[dim]Compare with the original commit message above.[/dim]")
-    console.print()
 
-    # Display the raw commit message as output
-    console.print("[bold cyan]─── Generated Commit Message ───[/bold cyan]")
-    console.print()
-    console.print(commit.formatted_message)
-    console.print()
-    console.print("[bold cyan]────────────────────────────────[/bold cyan]")
-    console.print()
+def print_cache_stats():
+    """Print response cache counters (see llm_cache)."""
+    from . import llm_cache
 
-    # Copy option
-    try:
-        if Confirm.ask("Copy message to clipboard?", default=False):
-            try:
-                import subprocess
-                # Try xclip (Linux)
-                process = subprocess.Popen(
-                    ["xclip", "-selection", "clipboard"],
-                    stdin=subprocess.PIPE,
-                )
-                process.communicate(commit.formatted_message.encode())
-                show_success("Message copied to clipboard!")
-            except (FileNotFoundError, Exception):
-                console.print("[dim]Clipboard not available. Message printed above.[/dim]")
-    except (EOFError, KeyboardInterrupt):
-        pass
+    stats = llm_cache.load_stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+    console.print(f"[bold]Response cache:[/bold] [dim]{llm_cache.CACHE_DIR}[/dim]")
+    console.print(f"    Hits:         {stats['hits']}")
+    console.print(f"    Misses:       {stats['misses']}")
+    console.print(f"    Hit rate:     {hit_rate}")
+    console.print(f"    Saved tokens: {stats['saved_tokens']:,}")
 
 
 def print_commit_help():
@@ -2570,6 +2921,12 @@ def print_commit_help():
     console.print(
         "    [green]--quick, -q[/green]    Quick mode: auto-detect repo, generate and commit"
     )
+    console.print(
+        "    [green]--refresh-credits[/green]  Re-query provider credits instead of using the cache"
+    )
+    console.print(
+        "    [green]--cache-stats[/green]  Show response cache hits and saved tokens"
+    )
     console.print(
         "    [green]--help, -h[/green]     Show this help message"
     )
@@ -2585,6 +2942,7 @@ def main():
 
     # Check for command line arguments
     quick_mode = False
+    refresh_credits = "--refresh-credits" in sys.argv[1:]
 
     if len(sys.argv) > 1:
         arg = sys.argv[1].lower()
@@ -2593,6 +2951,9 @@ def main():
         elif arg in ("--help", "-h"):
             print_commit_help()
             return
+        elif arg == "--cache-stats":
+            print_cache_stats()
+            return
 
     if not quick_mode:
         print_banner()
@@ -2637,7 +2998,9 @@ def main():
             run_gitlab_workflow(config)
             break
         elif choice == "ai_config":
-            should_return = run_ai_config_workflow(config)
+            should_return = run_ai_config_workflow(config, refresh_credits)
+            # Only the first visit bypasses the cache
+            refresh_credits = False
             if not should_return:
                 break
             # Loop back to show main menu again
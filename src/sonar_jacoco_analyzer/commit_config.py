@@ -32,6 +32,17 @@ class CommitConfig:
     max_commit_size: int = 200
     complexity_threshold: int = 50
 
+    # Send diffs with one line of context instead of three
+    compact_diff: bool = True
+
+    # Single-file changes up to this many lines are described without the API
+    # (0 always uses the API)
+    small_diff_threshold: int = 10
+
+    # Seconds a generated message is reused for an identical prompt
+    # (0 disables the response cache)
+    llm_cache_ttl: int = 7 * 24 * 3600
+
     # Commit types customization
     custom_types: Dict[str, str] = field(default_factory=dict)
 
@@ -74,6 +85,10 @@ class CommitConfig:
             # Commit splitting
             max_commit_size=int(os.getenv("MAX_COMMIT_SIZE", "200")),
             complexity_threshold=int(os.getenv("COMPLEXITY_THRESHOLD", "50")),
+            # Diff settings
+            compact_diff=os.getenv("COMPACT_DIFF", "true").lower() not in ("0", "false", "no"),
+            small_diff_threshold=int(os.getenv("SMALL_DIFF_THRESHOLD", "10")),
+            llm_cache_ttl=int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
             # Default exclude patterns
             exclude_patterns=[
                 "*.lock",
@@ -179,6 +194,9 @@ class CommitConfig:
             "openai_max_tokens": self.openai_max_tokens,
             "max_commit_size": self.max_commit_size,
             "complexity_threshold": self.complexity_threshold,
+            "compact_diff": self.compact_diff,
+            "small_diff_threshold": self.small_diff_threshold,
+            "llm_cache_ttl": self.llm_cache_ttl,
             "has_github_token": bool(self.github_token),
             "has_gitlab_token": bool(self.gitlab_token),
             "has_openai_key": bool(self.openai_api_key),
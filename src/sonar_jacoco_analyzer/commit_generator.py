@@ -4,20 +4,94 @@ OpenAI-powered commit message generation.
 
 import json
 import os
+import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 
 from openai import OpenAI, OpenAIError
 
+from . import llm_cache
 from .commit_config import CommitConfig, get_openai_prompt_config
 from .conventional_commit import (
     CommitType,
     ConventionalCommit,
     CommitMessageFormatter,
     ScopeExtractor,
-    CommitTypeDetector,
 )
 from .commit_splitter import SplitGroup
+from .git_operations import FileChange
+
+# Longest diff (in characters) included in a prompt
+MAX_DIFF_LENGTH = 8000
+
+# Files whose commit type is certain from the name alone, for
+# generate_trivial_commit. Stricter than CommitTypeDetector.TYPE_PATTERNS:
+# whole extensions and basenames only, never substrings of the path.
+_TEST_NAME_RE = re.compile(
+    r"^(test_.+\.py|.+_test\.(py|go)|.+\.(test|spec)\.(js|jsx|ts|tsx))$"
+)
+_CODE_EXTENSIONS = {
+    ".py", ".pyi", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".kts", ".scala",
+    ".groovy", ".go", ".rs", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".swift",
+    ".rb", ".php", ".sh", ".bash", ".sql", ".vue", ".dart", ".lua",
+}
+_TRIVIAL_EXTENSIONS = {
+    ".md": CommitType.DOCS,
+    ".rst": CommitType.DOCS,
+    ".adoc": CommitType.DOCS,
+    ".css": CommitType.STYLE,
+    ".scss": CommitType.STYLE,
+    ".less": CommitType.STYLE,
+}
+_TRIVIAL_NAMES = {
+    **dict.fromkeys(
+        ["LICENSE", "LICENSE.txt", "LICENCE", "COPYING", "CHANGELOG", "AUTHORS", "NOTICE"],
+        CommitType.DOCS,
+    ),
+    **dict.fromkeys(
+        [".gitlab-ci.yml", ".travis.yml", "Jenkinsfile", "azure-pipelines.yml"],
+        CommitType.CI,
+    ),
+    **dict.fromkeys(
+        ["package.json", "package-lock.json", "yarn.lock", "requirements.txt",
+         "requirements-dev.txt", "pyproject.toml", "Makefile", "Dockerfile",
+         "docker-compose.yml", "docker-compose.yaml", "pom.xml", "build.gradle",
+         "settings.gradle", "CMakeLists.txt"],
+        CommitType.BUILD,
+    ),
+    **dict.fromkeys(
+        [".gitignore", ".gitattributes", ".editorconfig", ".prettierrc", ".eslintrc",
+         ".eslintrc.json", "tsconfig.json"],
+        CommitType.CHORE,
+    ),
+}
+# Directories whose non-code files are CI configuration
+_CI_DIRS = (".github/", ".circleci/")
+
+
+def _trivial_commit_type(path: str) -> Optional[CommitType]:
+    """Commit type of a file that follows from its name alone, or None."""
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    if _TEST_NAME_RE.match(name):
+        return CommitType.TEST
+    if ext in _CODE_EXTENSIONS:
+        return None
+    if path.startswith(_CI_DIRS):
+        return CommitType.CI
+    return _TRIVIAL_NAMES.get(name) or _TRIVIAL_EXTENSIONS.get(ext)
+
+
+def _take_chars(chunks: Iterable[str], limit: int) -> str:
+    """Join chunks, consuming only as many as needed to pass limit characters."""
+    parts = []
+    size = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            break
+    return "".join(parts)
 
 
 @dataclass
@@ -113,29 +187,49 @@ class CommitGenerator:
 
     def generate_commit_message(
         self,
-        diff_content: str,
+        diff_content: Union[str, Iterable[str]],
         file_paths: List[str],
         context: Optional[Dict] = None,
+        use_cache: bool = True,
     ) -> GeneratedCommit:
         """
         Generate a commit message for the given diff.
 
+        Identical prompts are answered from llm_cache for
+        config.llm_cache_ttl seconds.
+
         Args:
-            diff_content: Git diff content.
+            diff_content: Git diff content, or an iterable of diff chunks that
+                is only consumed up to the truncation limit.
             file_paths: List of changed file paths.
             context: Optional additional context.
+            use_cache: Look up and store the response in the cache.
 
         Returns:
             GeneratedCommit with the generated message.
         """
+        if not isinstance(diff_content, str):
+            diff_content = _take_chars(diff_content, MAX_DIFF_LENGTH)
+
         # Truncate diff if too large
-        max_diff_length = 8000
-        if len(diff_content) > max_diff_length:
-            diff_content = diff_content[:max_diff_length] + "\n... (truncated)"
+        if len(diff_content) > MAX_DIFF_LENGTH:
+            diff_content = diff_content[:MAX_DIFF_LENGTH] + "\n... (truncated)"
 
         # Build the prompt
         messages = self._build_messages(diff_content, file_paths, context)
 
+        cache_key = None
+        if use_cache and self.config.llm_cache_ttl > 0:
+            cache_key = llm_cache.make_key(
+                self.config.openai_model,
+                self.config.openai_temperature,
+                self.config.openai_max_tokens,
+                messages,
+            )
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return GeneratedCommit.from_dict(cached)
+
         try:
             response = self.client.chat.completions.create(
                 model=self.config.openai_model,
@@ -151,7 +245,17 @@ class CommitGenerator:
                 raise InvalidResponseError("Empty response from API")
 
             data = json.loads(content)
-            return GeneratedCommit.from_dict(data)
+            commit = GeneratedCommit.from_dict(data)
+
+            if cache_key:
+                tokens = getattr(response.usage, "total_tokens", 0)
+                llm_cache.put(
+                    cache_key,
+                    data,
+                    self.config.llm_cache_ttl,
+                    tokens if isinstance(tokens, int) else 0,
+                )
+            return commit
 
         except json.JSONDecodeError as e:
             raise InvalidResponseError(f"Failed to parse API response as JSON: {e}")
@@ -160,6 +264,52 @@ class CommitGenerator:
                 raise RateLimitError("OpenAI API rate limit exceeded. Please try again later.")
             raise APIError(f"OpenAI API error: {e}")
 
+    def generate_trivial_commit(self, file_change: FileChange) -> Optional[GeneratedCommit]:
+        """
+        Build a commit message locally for a tiny single-file change.
+
+        Only applies when the change is within config.small_diff_threshold lines
+        and the commit type follows from the file's name alone (docs, tests, CI,
+        build, style or chore files); any other file with a code extension
+        goes to the API.
+
+        Args:
+            file_change: The single changed file.
+
+        Returns:
+            GeneratedCommit, or None if the change needs the API.
+        """
+        threshold = self.config.small_diff_threshold
+        if not threshold or file_change.additions + file_change.deletions > threshold:
+            return None
+
+        file_paths = [file_change.file_path]
+        commit_type = _trivial_commit_type(file_change.file_path)
+        if commit_type is None:
+            return None
+
+        verbs = {"A": "add", "D": "remove", "R": "rename"}
+        name = os.path.basename(file_change.file_path)
+        subject = f"{verbs.get(file_change.status, 'update')} {name}"
+        scope = ScopeExtractor.extract_scope(file_paths)
+
+        formatted = CommitMessageFormatter.create_commit_message(
+            commit_type=commit_type,
+            subject=subject,
+            scope=scope,
+        )
+
+        return GeneratedCommit(
+            type=commit_type,
+            scope=scope,
+            subject=subject,
+            body=None,
+            breaking=False,
+            breaking_description=None,
+            formatted_message=formatted,
+            confidence=0.5,
+        )
+
     def _build_messages(
         self,
         diff_content: str,
@@ -5,30 +5,52 @@ Analyzes git diffs and generates documentation updates using AI providers.
 Supports OpenAI (default) and DeepSeek.
 """
 
+import functools
+import hashlib
 import os
+import re
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from .env file
-load_dotenv()
 
 # --- CONFIGURATION MAPPING ---
-PROVIDERS = {
-    "openai": {
-        "env_var": "OPENAI_API_KEY",
-        "base_url": None,  # Defaults to OpenAI's standard URL
-        "model": "gpt-4-turbo",
-        "name": "OpenAI GPT-4 Turbo"
-    },
-    "deepseek": {
-        "env_var": "DEEPSEEK_API_KEY",
-        "base_url": "https://api.deepseek.com",
-        "model": "deepseek-chat",
-        "name": "DeepSeek V3"
-    }
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Settings for one AI provider."""
+
+    env_var: str
+    base_url: Optional[str]  # None defaults to OpenAI's standard URL
+    model: str
+    name: str
+    max_diff_tokens: int  # Token budget for the diff in one request
+    seed: Optional[int] = None  # Best-effort reproducible sampling, if supported
+
+    @property
+    def read_limit(self) -> int:
+        """Characters of git output worth reading for one request."""
+        return self.max_diff_tokens * READ_CHARS_PER_TOKEN
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    "openai": ProviderConfig(
+        env_var="OPENAI_API_KEY",
+        base_url=None,
+        model="gpt-4-turbo",
+        name="OpenAI GPT-4 Turbo",
+        max_diff_tokens=4000,
+        seed=0,
+    ),
+    "deepseek": ProviderConfig(
+        env_var="DEEPSEEK_API_KEY",
+        base_url="https://api.deepseek.com",
+        model="deepseek-chat",
+        name="DeepSeek V3",
+        max_diff_tokens=8000,  # DeepSeek handles larger contexts better
+    ),
 }
 
 # --- THE MASTER PROMPT ---
@@ -50,122 +72,641 @@ RULES:
 4. If trivial (typo, formatting), output "NO_UPDATES".
 """
 
+# --- GIT DIFF ---
+# Options added to every diff: no context lines and no colour codes, and
+# deleted files as a header only (their old content is not needed)
+DIFF_OPTIONS = ["--no-color", "--unified=0", "--irreversible-delete"]
 
-def get_git_diff(repo_path: str) -> str:
-    """Get the git diff between the last two commits.
+# --- DIFF CACHE ---
+# Diffs whose inputs can be fingerprinted without running git (a commit SHA,
+# or HEAD plus the index file's stat) are kept here across runs
+DIFF_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "sonar_jacoco_analyzer", "diffs"
+)
+DIFF_CACHE_MAX_ENTRIES = 64
+# Model responses, keyed by everything that goes into the request
+LLM_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "sonar_jacoco_analyzer", "llm"
+)
+LLM_CACHE_MAX_ENTRIES = 64
+_SHA_RE = re.compile(r"[0-9a-f]{40}")
+
+
+def _git_dir(repo_path: str):
+    """Return the git directory of a repository root, or None if not found."""
+    path = os.path.join(repo_path, ".git")
+    if os.path.isdir(path):
+        return path
+    try:
+        # Worktrees and submodules: ".git" is a file pointing at the git dir
+        with open(path, encoding="utf-8") as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if line.startswith("gitdir: "):
+        return os.path.normpath(os.path.join(repo_path, line[len("gitdir: "):]))
+    return None
+
+
+def _read_head(git_dir: str):
+    """Resolve HEAD to a commit SHA by reading ref files, or None if unsure."""
+    try:
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        return head if _SHA_RE.fullmatch(head) else None
+
+    # Branch refs live in the common dir when git_dir is a worktree
+    ref = head[len("ref: "):]
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        pass
+
+    try:
+        with open(os.path.join(common_dir, ref), encoding="utf-8") as f:
+            sha = f.read().strip()
+            return sha if _SHA_RE.fullmatch(sha) else None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref and _SHA_RE.fullmatch(sha):
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+def _diff_fingerprint(repo_path: str, kind: str, commit_id: str = None, limit: int = None):
+    """Fingerprint the inputs of a diff, or None if it must not be cached.
+
+    Args:
+        repo_path: Path to the git repository root.
+        kind: 'commit' (HEAD~1..HEAD), 'staged' or 'show' (one commit).
+        commit_id: Commit reference for 'show'.
+        limit: Read limit the diff was produced with (see _git_diff).
+
+    Returns:
+        Hex digest identifying the diff's inputs, or None.
+    """
+    git_dir = _git_dir(repo_path)
+    if git_dir is None:
+        return None
+
+    if kind == "show" and _SHA_RE.fullmatch(commit_id or ""):
+        state = commit_id
+    else:
+        head = _read_head(git_dir)
+        if head is None:
+            return None
+        if kind == "staged":
+            try:
+                index = os.stat(os.path.join(git_dir, "index"))
+            except OSError:
+                return None
+            state = f"{head}:{index.st_mtime_ns}:{index.st_size}"
+        elif kind == "commit" or commit_id == "HEAD":
+            state = head
+        else:
+            # Branch names and short SHAs would need git to resolve
+            return None
+
+    options = " ".join(DIFF_OPTIONS)
+    key = f"{os.path.realpath(repo_path)}\0{kind}\0{state}\0{limit}\0{options}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _cached_diff(
+    repo_path: str, kind: str, run, commit_id: str = None, limit: int = None
+) -> str:
+    """Return a diff from the cache, or compute it with ``run()`` and store it."""
+    fingerprint = _diff_fingerprint(repo_path, kind, commit_id, limit)
+    if fingerprint is None:
+        return run()
+
+    path = os.path.join(DIFF_CACHE_DIR, f"{fingerprint}.diff")
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    diff = run()
+    _write_cache_entry(DIFF_CACHE_DIR, path, diff, DIFF_CACHE_MAX_ENTRIES)
+    return diff
+
+
+def _write_cache_entry(cache_dir: str, path: str, text: str, max_entries: int):
+    """Store a cache file and keep only the ``max_entries`` newest in ``cache_dir``.
+
+    Errors are ignored; the caches are optional.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+        if len(entries) > max_entries:
+            entries.sort(key=os.path.getmtime)
+            for old in entries[:-max_entries]:
+                os.remove(old)
+    except OSError:
+        pass
+
+
+def _read_git_output(repo_path: str, git_args: list, limit: int) -> str:
+    """Run git and read at most ``limit + 1`` characters of its output.
+
+    Git is stopped as soon as more than ``limit`` characters have arrived, so
+    the rest of a large diff is never produced or decoded.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails before the limit is hit.
+    """
+    # stderr goes to a file: a pipe could fill up while stdout is being read
+    with tempfile.TemporaryFile() as stderr, subprocess.Popen(
+        ["git", *git_args],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+        text=True
+    ) as proc:
+        output = proc.stdout.read(limit + 1)
+        if len(output) > limit:
+            proc.kill()
+            return output
+        if proc.wait() != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(
+                proc.returncode, proc.args, output,
+                stderr.read().decode("utf-8", errors="replace")
+            )
+        return output
+
+
+def _git_diff(
+    repo_path: str,
+    git_args: list,
+    kind: str = None,
+    commit_id: str = None,
+    limit: int = None,
+) -> tuple[str, bool]:
+    """Run a git diff command, through the diff cache when ``kind`` is given.
 
     Args:
         repo_path: Path to the git repository.
+        git_args: Git subcommand and arguments producing the diff.
+        kind: Cache kind for _cached_diff, or None to always run git.
+        commit_id: Commit the diff belongs to, if any (used in errors).
+        limit: Only read up to ``limit + 1`` characters; a longer result
+            means the diff was cut off.
 
     Returns:
-        The git diff output as a string.
+        Tuple of (diff, truncated); truncated is True when the read stopped
+        at ``limit``.
 
     Raises:
-        SystemExit: If git command fails or git is not installed.
+        RuntimeError: If git command fails or git is not installed.
     """
-    try:
-        result = subprocess.run(
-            ["git", "diff", "HEAD~1", "HEAD"],
+    git_args = [git_args[0], *DIFF_OPTIONS, *git_args[1:]]
+
+    def run():
+        if limit is not None:
+            return _read_git_output(repo_path, git_args, limit)
+        return subprocess.run(
+            ["git", *git_args],
             cwd=repo_path,
             capture_output=True,
             text=True,
             check=True
-        )
-        return result.stdout
+        ).stdout
+
+    try:
+        if kind is None:
+            diff = run()
+        else:
+            diff = _cached_diff(repo_path, kind, run, commit_id, limit)
     except subprocess.CalledProcessError as e:
+        if commit_id is not None:
+            raise RuntimeError(
+                f"Error getting commit {commit_id}: {e.stderr.strip() if e.stderr else e}"
+            )
         raise RuntimeError(f"Error running git in {repo_path}: {e}")
     except FileNotFoundError:
         raise RuntimeError("Git is not installed.")
+    return diff, limit is not None and len(diff) > limit
+
+
+# `git diff --quiet` arguments that tell whether a diff source is empty; the
+# other sources are served from the diff cache, which is cheaper than a probe
+_QUIET_DIFF_ARGS = {
+    "unstaged": ["diff", "--quiet"],
+    "all": ["diff", "--quiet", "HEAD"],
+}
+
+
+def _has_changes(repo_path: str, diff_source: str):
+    """Ask git whether a diff source has changes, without producing the diff.
+
+    Returns:
+        True or False, or None if the source has no probe or git failed
+        (the full diff then reports any error).
+    """
+    args = _QUIET_DIFF_ARGS.get(diff_source)
+    if args is None:
+        return None
+    try:
+        result = subprocess.run(
+            ["git", *args], cwd=repo_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return None
+    return {0: False, 1: True}.get(result.returncode)
 
 
-def get_staged_diff(repo_path: str) -> str:
+def get_git_diff(repo_path: str, limit: int = None) -> tuple[str, bool]:
+    """Get the git diff between the last two commits.
+
+    Cached by the HEAD commit (see _cached_diff).
+
+    Args:
+        repo_path: Path to the git repository.
+        limit: Optional read limit (see _git_diff).
+
+    Returns:
+        Tuple of (diff, truncated) (see _git_diff).
+
+    Raises:
+        RuntimeError: If git command fails or git is not installed.
+    """
+    return _git_diff(repo_path, ["diff", "HEAD~1", "HEAD"], "commit", limit=limit)
+
+
+def get_staged_diff(repo_path: str, limit: int = None) -> tuple[str, bool]:
     """Get the git diff of staged changes.
 
+    Cached by the HEAD commit and the index file's mtime and size.
+
     Args:
         repo_path: Path to the git repository.
+        limit: Optional read limit (see _git_diff).
 
     Returns:
-        The git diff output as a string.
+        Tuple of (diff, truncated) (see _git_diff).
 
     Raises:
         RuntimeError: If git command fails or git is not installed.
     """
-    try:
-        result = subprocess.run(
-            ["git", "diff", "--cached"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Error running git in {repo_path}: {e}")
-    except FileNotFoundError:
-        raise RuntimeError("Git is not installed.")
+    return _git_diff(repo_path, ["diff", "--cached"], "staged", limit=limit)
 
 
-def get_unstaged_diff(repo_path: str) -> str:
+def get_unstaged_diff(repo_path: str, limit: int = None) -> tuple[str, bool]:
     """Get the git diff of unstaged changes.
 
     Args:
         repo_path: Path to the git repository.
+        limit: Optional read limit (see _git_diff).
 
     Returns:
-        The git diff output as a string.
+        Tuple of (diff, truncated) (see _git_diff).
 
     Raises:
         RuntimeError: If git command fails or git is not installed.
     """
-    try:
-        result = subprocess.run(
-            ["git", "diff"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Error running git in {repo_path}: {e}")
-    except FileNotFoundError:
-        raise RuntimeError("Git is not installed.")
+    return _git_diff(repo_path, ["diff"], limit=limit)
 
 
-def get_commit_diff(repo_path: str, commit_id: str = "HEAD") -> str:
+def get_commit_diff(repo_path: str, commit_id: str = "HEAD", limit: int = None) -> tuple[str, bool]:
     """Get the git diff for a specific commit.
 
+    Cached when the commit is HEAD or a full SHA.
+
     Args:
         repo_path: Path to the git repository.
         commit_id: Commit SHA or reference (default: HEAD).
+        limit: Optional read limit (see _git_diff).
 
     Returns:
-        The git diff output as a string.
+        Tuple of (diff, truncated) (see _git_diff).
 
     Raises:
         RuntimeError: If git command fails or git is not installed.
     """
+    return _git_diff(repo_path, ["show", "--format=", commit_id], "show", commit_id, limit)
+
+
+# --- DIFF TRIMMING ---
+# Rough characters per token, used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+# Git output read per budgeted token; generous so dense diffs still fill the budget
+READ_CHARS_PER_TOKEN = 6
+_FILE_SECTION_RE = re.compile(r"^diff --git ", re.MULTILINE)
+_HUNK_RE = re.compile(r"^@@ ", re.MULTILINE)
+_SECTION_PATH_RE = re.compile(r"^diff --git a/(.*?) b/", re.MULTILINE)
+_LOW_SIGNAL_FILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "Cargo.lock", "go.sum", "composer.lock", "Gemfile.lock",
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Approximate token count from the character count."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@functools.lru_cache(maxsize=4)
+def _token_counter(model: str):
+    """Return a function counting tokens for ``model``.
+
+    Uses tiktoken when it is installed (``pip install .[tokens]``) and falls
+    back to a character-based estimate otherwise.
+    """
     try:
-        result = subprocess.run(
-            ["git", "show", "--format=", commit_id],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
+        import tiktoken
+    except ImportError:
+        return _estimate_tokens
+
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Unknown to tiktoken (e.g. deepseek-chat); close enough for a budget
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Encodings are downloaded on first use and may be unavailable offline
+        return _estimate_tokens
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _section_priority(section: str) -> int:
+    """Rank a per-file diff section: source first, then tests, then lock files."""
+    match = _SECTION_PATH_RE.match(section)
+    path = match.group(1) if match else ""
+    if os.path.basename(path) in _LOW_SIGNAL_FILES:
+        return 2
+    parts = path.lower().split("/")
+    if any(p in ("test", "tests", "__tests__") for p in parts[:-1]) or "test" in parts[-1]:
+        return 1
+    return 0
+
+
+def _split_sections(diff: str) -> list:
+    """Split a diff at ``diff --git`` lines, keeping any leading text as its own part."""
+    starts = [m.start() for m in _FILE_SECTION_RE.finditer(diff)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [diff[a:b] for a, b in zip(starts, starts[1:] + [len(diff)])]
+
+
+def _trim_hunks(section: str, budget: int, count) -> str:
+    """Keep the file header and as many leading whole hunks as fit in ``budget``."""
+    starts = [m.start() for m in _HUNK_RE.finditer(section)]
+    if not starts:
+        return ""
+    kept = section[:starts[0]]
+    if count(kept) > budget:
+        return ""
+    for a, b in zip(starts, starts[1:] + [len(section)]):
+        candidate = kept + section[a:b]
+        if count(candidate) > budget:
+            break
+        kept = candidate
+    return kept if len(kept) > starts[0] else ""
+
+
+def trim_diff(diff: str, provider_key: str) -> tuple[str, bool]:
+    """Fit a diff into the provider's token budget without cutting hunks in half.
+
+    Whole file sections are packed greedily, source files first, then tests,
+    then lock files; the kept sections stay in their original order. If not
+    even one file fits, the highest-priority file is cut at a hunk boundary.
+
+    Args:
+        diff: The git diff to trim.
+        provider_key: The AI provider the diff is sent to.
+
+    Returns:
+        Tuple of (diff, truncated).
+    """
+    config = PROVIDERS[provider_key]
+    budget = config.max_diff_tokens
+    count = _token_counter(config.model)
+    if count(diff) <= budget:
+        return diff, False
+
+    sections = _split_sections(diff)
+    order = sorted(range(len(sections)), key=lambda i: _section_priority(sections[i]))
+    kept = {}
+    used = 0
+    for i in order:
+        tokens = count(sections[i])
+        if used + tokens <= budget:
+            kept[i] = sections[i]
+            used += tokens
+
+    if not kept:
+        first = order[0]
+        kept[first] = (
+            _trim_hunks(sections[first], budget, count)
+            or sections[first][:budget * CHARS_PER_TOKEN]
         )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Error getting commit {commit_id}: {e.stderr.strip() if e.stderr else e}")
-    except FileNotFoundError:
-        raise RuntimeError("Git is not installed.")
+
+    return "".join(kept[i] for i in sorted(kept)), True
+
+
+# --- TRIVIAL CHANGES ---
+# Files whose changes never need docs generated from them (exact basenames)
+_DOC_EXTENSIONS = {".md", ".markdown", ".rst", ".adoc"}
+_DOC_NAMES = {
+    "LICENSE", "LICENSE.txt", "LICENCE", "LICENCE.txt", "COPYING", "COPYING.txt",
+    "AUTHORS", "AUTHORS.txt", "CHANGELOG", "CHANGELOG.txt", "NOTICE", "NOTICE.txt",
+}
+# Line prefixes that start a comment, per file extension; files of any other
+# type are never treated as comment-only. C-family languages leave out "*"
+# (pointer dereference) and "#" (preprocessor, Rust attributes).
+_HASH_COMMENT = ("#",)
+_C_COMMENT = ("//", "/*")
+_BLOCK_COMMENT = ("//", "/*", "* ", "*/")
+_COMMENT_PREFIXES = {
+    **dict.fromkeys(
+        [".py", ".pyi", ".sh", ".bash", ".zsh", ".rb", ".pl", ".r",
+         ".yaml", ".yml", ".toml", ".cfg", ".properties"],
+        _HASH_COMMENT,
+    ),
+    **dict.fromkeys([".c", ".h", ".cc", ".cpp", ".hpp", ".go", ".rs"], _C_COMMENT),
+    **dict.fromkeys(
+        [".java", ".kt", ".kts", ".scala", ".groovy", ".gradle", ".js", ".jsx",
+         ".ts", ".tsx", ".cs", ".swift", ".dart"],
+        _BLOCK_COMMENT,
+    ),
+    **dict.fromkeys([".html", ".htm", ".xml", ".vue"], ("<!--",)),
+    **dict.fromkeys([".sql", ".lua", ".hs"], ("--",)),
+}
+# Languages where leading whitespace is syntax, so re-indenting is a real change
+_INDENT_SENSITIVE = {".py", ".pyi", ".yaml", ".yml", ".haml", ".pug", ".coffee"}
+
+
+def _is_doc_file(path: str) -> bool:
+    """Whether a path is documentation or a license-style text file."""
+    name = os.path.basename(path)
+    return os.path.splitext(name)[1].lower() in _DOC_EXTENSIONS or name in _DOC_NAMES
+
+
+def _is_trivial_section(path: str, section: str) -> bool:
+    """Whether one file's diff is docs-only, whitespace-only or comment-only.
+
+    Whitespace-only means the changed lines match once blank lines and
+    trailing whitespace (and indentation, where it is not syntax) are
+    ignored; whitespace inside a line always counts. A section without
+    changed lines (rename, mode change, binary or deleted file) is never
+    trivial.
+    """
+    if _is_doc_file(path):
+        return True
+
+    ext = os.path.splitext(path)[1].lower()
+    added, removed = [], []
+    start = _HUNK_RE.search(section)
+    # Only hunk lines count; "---"/"+++" file headers come before the first hunk
+    for line in section[start.start():].splitlines() if start else []:
+        if line.startswith("+"):
+            added.append(line[1:])
+        elif line.startswith("-"):
+            removed.append(line[1:])
+    if not added and not removed:
+        return False
+
+    def normalize(lines):
+        strip = str.rstrip if ext in _INDENT_SENSITIVE else str.strip
+        return [strip(line) for line in lines if line.strip()]
+
+    if normalize(added) == normalize(removed):
+        return True
+    prefixes = _COMMENT_PREFIXES.get(ext)
+    return prefixes is not None and all(
+        not line.strip() or line.lstrip().startswith(prefixes)
+        for line in added + removed
+    )
+
+
+def is_trivial_diff(diff: str) -> bool:
+    """Whether every file in a diff is a trivial change (see _is_trivial_section).
+
+    Such diffs are answered with NO_UPDATES locally, without calling the API.
+    """
+    file_diffs = split_file_diffs(diff)
+    return bool(file_diffs) and all(
+        _is_trivial_section(path, section) for path, section in file_diffs
+    )
+
+# --- STREAMING ---
+# Characters of the (left-stripped) answer checked for NO_UPDATES before any
+# output is written; the rest of the stream is skipped when it matches.
+NO_UPDATES_HEAD = 32
+
+# Sampling settings: deterministic, with a bounded answer length
+DOCS_TEMPERATURE = 0.0
+DOCS_MAX_TOKENS = 2048
+
+# --- BATCHING ---
+# Files documented per request by generate_docs_batched; each file gets
+# DOCS_MAX_TOKENS of answer, up to the models' output limit per request
+DOCS_BATCH_SIZE = 4
+DOCS_BATCH_MAX_TOKENS = 4096
+# Batched requests in flight at once
+DOCS_MAX_CONCURRENCY = 8
+BATCH_INSTRUCTIONS = """
+5. The diff is split into sections that start with "=== SOURCE: [Path] ===".
+   Answer every section separately: repeat its "=== SOURCE: [Path] ===" line,
+   then give the documentation for that file (or "NO_UPDATES").
+"""
+_BATCH_SOURCE_RE = re.compile(r"^=== SOURCE: (.+?) ===[ \t]*$", re.MULTILINE)
+
+# Keep-alive pool of the shared per-provider clients
+HTTP_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0
+# Retries of rate-limited (429), timed out and 5xx requests; the SDK backs off
+# exponentially with jitter and honours Retry-After
+DOCS_MAX_RETRIES = 4
 
 
-def generate_docs(diff_content: str, provider_key: str) -> str:
+@functools.lru_cache(maxsize=None)
+def _load_env_file():
+    """Load environment variables from the .env file, once per process."""
+    # Imported here: most runs already have the key in the environment
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def get_api_key(provider_key: str):
+    """Return a provider's API key, reading .env only if it is not already set.
+
+    Args:
+        provider_key: The AI provider ('openai' or 'deepseek').
+
+    Returns:
+        The API key, or None if it is not configured.
+    """
+    env_var = PROVIDERS[provider_key].env_var
+    api_key = os.getenv(env_var)
+    if not api_key:
+        _load_env_file()
+        api_key = os.getenv(env_var)
+    return api_key
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(provider_key: str):
+    """Return the shared OpenAI-compatible client for a provider.
+
+    Clients are memoized so repeated calls reuse the TLS session and
+    connection pool instead of setting up a new one each time. Transient
+    failures are retried in-process instead of failing the run.
+    """
+    # Imported here so the CLI menus that import this module never load openai.
+    import httpx
+    from openai import OpenAI
+
+    config = PROVIDERS[provider_key]
+    api_key = get_api_key(provider_key)
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+    )
+    # Note: If base_url is None, the library defaults to OpenAI
+    return OpenAI(
+        api_key=api_key,
+        base_url=config.base_url,
+        http_client=http_client,
+        max_retries=DOCS_MAX_RETRIES,
+    )
+
+
+def generate_docs(diff_content: str, provider_key: str, output_file: str = None) -> str:
     """Generate documentation using the specified AI provider.
 
+    The response is streamed. When ``output_file`` is given, tokens are
+    written to ``<output_file>.partial`` as they arrive and the file is moved
+    into place once the response is complete. If the model starts its answer
+    with NO_UPDATES the stream is closed right away and nothing is written.
+
+    Responses are cached in LLM_CACHE_DIR, so the same diff sent to the same
+    provider and model is answered without calling the API.
+
     Args:
         diff_content: The git diff to analyze.
         provider_key: The AI provider to use ('openai' or 'deepseek').
+        output_file: Optional path to write the documentation to.
 
     Returns:
         The generated documentation as a string.
@@ -174,38 +715,235 @@ def generate_docs(diff_content: str, provider_key: str) -> str:
         ValueError: If API key is not configured.
         RuntimeError: If API call fails.
     """
+    return _complete(
+        provider_key,
+        SYSTEM_PROMPT,
+        f"Here is the Git Diff:\n\n{diff_content}",
+        output_file,
+        stop_on_no_updates=True,
+    )
+
+
+def _complete(
+    provider_key: str,
+    system_prompt: str,
+    user_content: str,
+    output_file: str = None,
+    stop_on_no_updates: bool = False,
+    max_tokens: int = DOCS_MAX_TOKENS,
+) -> str:
+    """Stream one chat completion through the response cache (see generate_docs)."""
     # Load configuration based on the chosen provider
     config = PROVIDERS[provider_key]
-    api_key = os.getenv(config["env_var"])
+    options = {"seed": config.seed} if config.seed is not None else {}
+
+    key = "|".join([
+        provider_key, config.model, str(DOCS_TEMPERATURE), str(max_tokens),
+        str(options.get("seed")), system_prompt, user_content,
+    ])
+    cache_file = os.path.join(
+        LLM_CACHE_DIR, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".md"
+    )
+    try:
+        with open(cache_file, encoding="utf-8", newline="") as f:
+            docs_update = f.read()
+    except (OSError, UnicodeDecodeError):
+        pass
+    else:
+        if output_file and "NO_UPDATES" not in docs_update:
+            with open(output_file, "w") as f:
+                f.write(docs_update)
+        return docs_update
+
+    api_key = get_api_key(provider_key)
 
     if not api_key:
-        raise ValueError(f"{config['env_var']} environment variable not found.")
+        raise ValueError(f"{config.env_var} environment variable not found.")
 
-    # Initialize Client
-    # Note: If base_url is None, the library defaults to OpenAI
-    client = OpenAI(api_key=api_key, base_url=config["base_url"])
+    client = _get_client(provider_key)
+
+    partial_file = output_file + ".partial" if output_file else None
+    parts = []
+    f = None
 
     try:
-        response = client.chat.completions.create(
-            model=config["model"],
+        stream = client.chat.completions.create(
+            model=config.model,
             messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Here is the Git Diff:\n\n{diff_content}"}
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
             ],
-            temperature=0.2,
-            stream=False
+            temperature=DOCS_TEMPERATURE,
+            max_tokens=max_tokens,
+            stream=True,
+            **options
         )
-        return response.choices[0].message.content
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                if not token:
+                    continue
+                parts.append(token)
+                if f is not None:
+                    f.write(token)
+                    continue
+
+                # Hold the first tokens back until the head of the answer
+                # shows whether the model is saying NO_UPDATES
+                head = "".join(parts).lstrip()
+                if stop_on_no_updates and "NO_UPDATES" in head[:NO_UPDATES_HEAD]:
+                    break
+                if partial_file and len(head) >= NO_UPDATES_HEAD:
+                    # Line buffered: the partial file grows a line at a time
+                    # instead of costing a write syscall per token
+                    f = open(partial_file, "w", buffering=1)
+                    f.write("".join(parts))
+        finally:
+            stream.close()
+            if f is not None:
+                f.close()
     except Exception as e:
+        if f is not None:
+            _remove_quietly(partial_file)
         raise RuntimeError(f"Error calling API: {e}")
 
+    docs_update = "".join(parts)
+    if partial_file and "NO_UPDATES" not in docs_update:
+        if f is None:
+            # Short answer that never reached the head length
+            with open(partial_file, "w") as out:
+                out.write(docs_update)
+        os.replace(partial_file, output_file)
+    elif f is not None:
+        _remove_quietly(partial_file)
+
+    _write_cache_entry(LLM_CACHE_DIR, cache_file, docs_update, LLM_CACHE_MAX_ENTRIES)
+    return docs_update
+
+
+def split_file_diffs(diff: str) -> list:
+    """Split a diff into ``(path, diff)`` pairs, one per ``diff --git`` section.
+
+    Text before the first section (if any) is dropped.
+    """
+    pairs = []
+    for section in _split_sections(diff):
+        match = _SECTION_PATH_RE.match(section)
+        if match:
+            pairs.append((match.group(1), section))
+    return pairs
+
+
+def _pack_batches(file_diffs: list, provider_key: str) -> list:
+    """Group ``(path, diff)`` pairs into batches within the provider's token budget.
+
+    A batch holds at most DOCS_BATCH_SIZE files. A file that does not fit in
+    the budget on its own is trimmed at hunk boundaries and sent alone.
+    """
+    config = PROVIDERS[provider_key]
+    budget = config.max_diff_tokens
+    count = _token_counter(config.model)
+
+    batches = []
+    current = []
+    used = 0
+    for path, file_diff in file_diffs:
+        tokens = count(file_diff)
+        if tokens > budget:
+            file_diff, _ = trim_diff(file_diff, provider_key)
+            batches.append([(path, file_diff)])
+            continue
+        if current and (used + tokens > budget or len(current) >= DOCS_BATCH_SIZE):
+            batches.append(current)
+            current = []
+            used = 0
+        current.append((path, file_diff))
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_response(text: str) -> dict:
+    """Map each ``=== SOURCE: <path> ===`` section of a batched answer to its body."""
+    results = {}
+    matches = list(_BATCH_SOURCE_RE.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(text)
+        results[match.group(1).strip()] = text[match.end():end].strip()
+    return results
+
+
+def generate_docs_batched(file_diffs: list, provider_key: str) -> dict:
+    """Generate documentation for many files with as few API calls as possible.
+
+    Files are packed up to DOCS_BATCH_SIZE per request (within the provider's
+    token budget) and the model answers each one in its own section. Up to
+    DOCS_MAX_CONCURRENCY requests run at once. Files missing from a batched
+    answer (e.g. because it hit the token limit) are retried on their own.
+
+    Args:
+        file_diffs: ``(path, diff)`` pairs, e.g. from split_file_diffs().
+        provider_key: The AI provider to use ('openai' or 'deepseek').
+
+    Returns:
+        Dictionary mapping each answered path to its documentation (which may
+        be NO_UPDATES).
+
+    Raises:
+        ValueError: If API key is not configured.
+        RuntimeError: If API call fails.
+    """
+    def document(batch):
+        if len(batch) == 1:
+            path, file_diff = batch[0]
+            return {path: generate_docs(file_diff, provider_key)}
+
+        user_content = "Here are the Git Diffs, one section per file:\n\n" + "\n".join(
+            f"=== SOURCE: {path} ===\n{file_diff}" for path, file_diff in batch
+        )
+        answer = _complete(
+            provider_key,
+            SYSTEM_PROMPT + BATCH_INSTRUCTIONS,
+            user_content,
+            max_tokens=min(DOCS_MAX_TOKENS * len(batch), DOCS_BATCH_MAX_TOKENS),
+        )
+        results = _parse_batch_response(answer)
+        for item in batch:
+            if item[0] not in results:
+                results.update(document([item]))
+        return results
+
+    batches = _pack_batches(file_diffs, provider_key)
+    if len(batches) <= 1:
+        return document(batches[0]) if batches else {}
+
+    # Batches are independent requests; the shared client's keep-alive pool
+    # is larger than the worker count, and 429s are retried by the SDK
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(DOCS_MAX_CONCURRENCY, len(batches))) as pool:
+        for answer in pool.map(document, batches):
+            results.update(answer)
+    return results
+
+
+def _remove_quietly(path: str):
+    """Delete a file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 
 def run_docs_generator(
     repo_path: str = ".",
     output_dir: str = None,
     provider: str = "openai",
     diff_source: str = "commit",
-    commit_id: str = None
+    commit_id: str = None,
+    per_file: bool = False
 ) -> tuple[bool, str]:
     """Run the documentation generator.
 
@@ -216,6 +954,8 @@ def run_docs_generator(
         diff_source: Source of diff ('commit', 'staged', 'unstaged', 'all',
                      'current_commit', 'specific_commit').
         commit_id: Specific commit ID when diff_source is 'specific_commit'.
+        per_file: Document each changed file separately (see
+                  generate_docs_batched) instead of the diff as a whole.
 
     Returns:
         Tuple of (success: bool, message: str).
@@ -227,25 +967,38 @@ def run_docs_generator(
     else:
         output_dir = os.path.join(repo_path, "docs")
 
+    # Git output past what the token budget can use is not even read
+    limit = PROVIDERS[provider].read_limit
+    if per_file:
+        limit *= DOCS_BATCH_SIZE
+
+    # Settle "nothing changed" with an exit code before reading any diff
+    if _has_changes(repo_path, diff_source) is False:
+        return False, "No changes found."
+
     # Get Changes based on diff_source
     try:
         if diff_source == "commit":
-            diff = get_git_diff(repo_path)
+            diff, read_truncated = get_git_diff(repo_path, limit)
         elif diff_source == "staged":
-            diff = get_staged_diff(repo_path)
+            diff, read_truncated = get_staged_diff(repo_path, limit)
         elif diff_source == "unstaged":
-            diff = get_unstaged_diff(repo_path)
+            diff, read_truncated = get_unstaged_diff(repo_path, limit)
         elif diff_source == "all":
-            # Combine staged and unstaged
-            staged = get_staged_diff(repo_path)
-            unstaged = get_unstaged_diff(repo_path)
-            diff = staged + "\n" + unstaged
+            # Combine staged and unstaged; the two git processes run at once
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                staged = pool.submit(get_staged_diff, repo_path, limit)
+                unstaged = pool.submit(get_unstaged_diff, repo_path, limit)
+                staged_diff, staged_truncated = staged.result()
+                unstaged_diff, unstaged_truncated = unstaged.result()
+            diff = staged_diff + "\n" + unstaged_diff
+            read_truncated = staged_truncated or unstaged_truncated
         elif diff_source == "current_commit":
-            diff = get_commit_diff(repo_path, "HEAD")
+            diff, read_truncated = get_commit_diff(repo_path, "HEAD", limit)
         elif diff_source == "specific_commit":
             if not commit_id:
                 return False, "No commit ID provided for specific_commit source."
-            diff = get_commit_diff(repo_path, commit_id)
+            diff, read_truncated = get_commit_diff(repo_path, commit_id, limit)
         else:
             return False, f"Invalid diff_source: {diff_source}"
     except RuntimeError as e:
@@ -254,36 +1007,74 @@ def run_docs_generator(
     if not diff.strip():
         return False, "No changes found."
 
-    # Safety Truncate (DeepSeek handles larger contexts better)
-    limit = 30000 if provider == "deepseek" else 15000
-    truncated = False
-    if len(diff) > limit:
-        diff = diff[:limit]
-        truncated = True
+    # Whitespace, comment and docs-only changes (SYSTEM_PROMPT rule 4); a
+    # diff cut off at the read limit may hide code changes past the cut
+    if not read_truncated and is_trivial_diff(diff):
+        return True, "No documentation updates required."
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, "docs_suggestion.md")
+
+    if per_file:
+        return _run_per_file(diff, provider, output_file, read_truncated)
 
-    # Generate Content
+    # Safety trim to the provider's token budget, keeping whole hunks
+    diff, truncated = trim_diff(diff, provider)
+    truncated = truncated or read_truncated
+
+    # Generate Content (streamed straight into output_file)
     try:
-        docs_update = generate_docs(diff, provider)
+        docs_update = generate_docs(diff, provider, output_file)
     except (ValueError, RuntimeError) as e:
         return False, str(e)
 
-    # Save Output
     if "NO_UPDATES" in docs_update:
         return True, "No documentation updates required."
 
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, "docs_suggestion.md")
-
-    with open(output_file, "w") as f:
-        f.write(docs_update)
-
     message = f"Documentation saved to: {output_file}"
     if truncated:
-        message = f"Warning: Diff was truncated to {limit} chars.\n{message}"
+        budget = PROVIDERS[provider].max_diff_tokens
+        message = f"Warning: Diff was trimmed to {budget} tokens.\n{message}"
 
     return True, message
 
 
+def _run_per_file(
+    diff: str, provider: str, output_file: str, read_truncated: bool = False
+) -> tuple[bool, str]:
+    """Document each file of ``diff`` and save the answers that need updates.
+
+    When ``read_truncated`` is set the last file was cut off at the read
+    limit, so it is sent even if the part that was read looks trivial.
+    """
+    all_diffs = split_file_diffs(diff)
+    file_diffs = [
+        (path, section) for i, (path, section) in enumerate(all_diffs)
+        if (read_truncated and i == len(all_diffs) - 1)
+        or not _is_trivial_section(path, section)
+    ]
+    try:
+        results = generate_docs_batched(file_diffs, provider)
+    except (ValueError, RuntimeError) as e:
+        return False, str(e)
+
+    sections = [
+        f"## Source: {path}\n\n{results[path]}\n"
+        for path, _ in file_diffs
+        if path in results and "NO_UPDATES" not in results[path]
+    ]
+    missing = [path for path, _ in file_diffs if path not in results]
+    warning = f"Warning: No answer for: {', '.join(missing)}\n" if missing else ""
+    if not sections:
+        return True, f"{warning}No documentation updates required."
+
+    with open(output_file, "w") as f:
+        f.write("\n".join(sections))
+    return True, (
+        f"{warning}Documentation for {len(sections)} file(s) saved to: {output_file}"
+    )
+
+
 def main():
     """Main entry point for standalone execution."""
     import argparse
@@ -326,20 +1117,28 @@ Examples:
         default="commit",
         help="Source of changes to analyze (default: commit)"
     )
+    parser.add_argument(
+        "--per-file",
+        action="store_true",
+        help="Document each changed file separately, batching several files per request"
+    )
 
     args = parser.parse_args()
+    # Resolved once, so the printed path is the one the generator uses
+    repo_path = os.path.abspath(os.path.expanduser(args.repo))
 
-    print(f"Project Path:    {os.path.abspath(args.repo)}")
-    print(f"Using Provider:  {PROVIDERS[args.provider]['name']}")
+    print(f"Project Path:    {repo_path}")
+    print(f"Using Provider:  {PROVIDERS[args.provider].name}")
     print(f"Diff Source:     {args.diff_source}")
     print()
     print("AI is analyzing changes...")
 
     success, message = run_docs_generator(
-        repo_path=args.repo,
+        repo_path=repo_path,
         output_dir=args.output,
         provider=args.provider,
-        diff_source=args.diff_source
+        diff_source=args.diff_source,
+        per_file=args.per_file
     )
 
     if success:
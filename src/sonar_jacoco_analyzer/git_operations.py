@@ -4,11 +4,183 @@ Local git operations using GitPython.
 
 import os
 import re
+import shutil
+import subprocess
+import threading
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 from git import Repo, InvalidGitRepositoryError, GitCommandError
 
+# Passed to every git process we spawn: skip optional index lock probing
+# (e.g. the stat refresh done by diff/status), never start an auto-gc and
+# never set up a pager.
+GIT_ENV = {"GIT_OPTIONAL_LOCKS": "0", "GIT_PAGER": "cat"}
+GIT_CONFIG_ARGS = ("--no-pager", "-c", "core.preloadindex=true", "-c", "gc.auto=0")
+
+# stream_git_output reads git output in chunks of this size and keeps at
+# most DIFF_READ_LIMIT bytes of patch, well above the 8000 characters
+# CommitGenerator puts in the prompt.
+DIFF_CHUNK_SIZE = 64 * 1024
+DIFF_READ_LIMIT = 64 * 1024
+
+# Diff options used when CommitConfig.compact_diff is set: less context
+# means fewer prompt tokens for the same set of changes
+COMPACT_DIFF_ARGS = ("--unified=1", "--no-color", "--diff-algorithm=histogram")
+
+
+@lru_cache(maxsize=None)
+def _git_executable() -> str:
+    """
+    Resolve git to an absolute path once.
+
+    subprocess only launches a child with posix_spawn (instead of fork/exec)
+    when the executable has a directory component and close_fds is off.
+    The latter is safe because Python creates file descriptors
+    non-inheritable (PEP 446).
+    """
+    return shutil.which("git") or "git"
+
+
+def run_git(
+    repo_path: str, args: List[str], text: bool = False, timeout: int = 30
+) -> subprocess.CompletedProcess:
+    """
+    Run a git command in a repository without lock probing or auto-gc.
+
+    Args:
+        repo_path: Path to the git repository.
+        args: Git subcommand and its arguments.
+        text: Decode stdout/stderr as UTF-8 (invalid bytes replaced) instead
+            of returning bytes. Git output is UTF-8 regardless of the locale.
+        timeout: Seconds to wait before raising subprocess.TimeoutExpired.
+
+    Returns:
+        The completed process; the caller checks the return code.
+    """
+    return subprocess.run(
+        [_git_executable(), *GIT_CONFIG_ARGS, "-C", repo_path, *args],
+        capture_output=True,
+        close_fds=False,
+        encoding="utf-8" if text else None,
+        errors="replace" if text else None,
+        timeout=timeout,
+        env={**os.environ, **GIT_ENV},
+    )
+
+
+def popen_git(repo_path: str, args: List[str]) -> subprocess.Popen:
+    """
+    Start a git command whose stdout is read incrementally by the caller.
+
+    Uses the same options as run_git; stderr is discarded.
+
+    Args:
+        repo_path: Path to the git repository.
+        args: Git subcommand and its arguments.
+
+    Returns:
+        The running process with stdout as a binary pipe.
+    """
+    return subprocess.Popen(
+        [_git_executable(), *GIT_CONFIG_ARGS, "-C", repo_path, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        close_fds=False,
+        env={**os.environ, **GIT_ENV},
+    )
+
+
+def stream_git_output(repo_path: str, args: List[str]) -> Optional[bytearray]:
+    """
+    Read the output of a ``--numstat -z -p`` git command.
+
+    Output is read in chunks and git is stopped once the patch (everything
+    after the empty record that ends the numstat block) exceeds
+    DIFF_READ_LIMIT bytes, so huge diffs are never fully buffered.
+
+    Args:
+        repo_path: Path to the git repository.
+        args: Git subcommand and its arguments.
+
+    Returns:
+        The (possibly truncated) output, or None if git failed.
+
+    Raises:
+        subprocess.TimeoutExpired: If git does not finish within 30 seconds.
+    """
+    process = popen_git(repo_path, args)
+    timed_out = threading.Event()
+
+    def _kill_on_timeout():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(30, _kill_on_timeout)
+    timer.start()
+    output = bytearray()
+    patch_start = -1
+    truncated = False
+    try:
+        while True:
+            chunk = process.stdout.read1(DIFF_CHUNK_SIZE)
+            if not chunk:
+                break
+            searched = max(len(output) - 1, 0)
+            output += chunk
+            if patch_start == -1:
+                # An empty record separates the numstat block from the patch
+                end = output.find(b"\0\0", searched)
+                patch_start = end + 2 if end != -1 else -1
+            if patch_start != -1 and len(output) - patch_start > DIFF_READ_LIMIT:
+                truncated = True
+                break
+    finally:
+        if truncated:
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+        timer.cancel()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(["git", *args], 30)
+    if not truncated and returncode != 0:
+        return None
+    return output
+
+
+def parse_numstat_patch(output: bytearray, pos: int = 0) -> Tuple[str, List[str]]:
+    """
+    Split ``--numstat -z -p`` output into the patch and the changed files.
+
+    Args:
+        output: Raw git output.
+        pos: Offset where the numstat records start.
+
+    Returns:
+        Tuple of (diff_content, file_paths).
+    """
+    file_paths = []
+    while pos < len(output):
+        end = output.find(b"\0", pos)
+        if end == -1 or end == pos:
+            break
+        record = output[pos:end]
+        pos = end + 1
+        path = record.split(b"\t", 2)[2]
+        if not path:
+            # Rename or copy: "adds\tdels\t\0old\0new\0"; keep the new path
+            old_end = output.find(b"\0", pos)
+            new_end = output.find(b"\0", old_end + 1)
+            path = output[old_end + 1:new_end]
+            pos = new_end + 1
+        file_paths.append(path.decode("utf-8", errors="replace"))
+
+    if not file_paths:
+        return "", []
+    patch = output[pos + 1:pos + 1 + DIFF_READ_LIMIT]
+    return patch.decode("utf-8", errors="replace"), file_paths
+
 
 @dataclass
 class FileChange:
@@ -102,12 +274,63 @@ class GitOperations:
         try:
             self.repo = Repo(self.repo_path, search_parent_directories=True)
             self.repo_path = self.repo.working_dir
+            self.repo.git.update_environment(**GIT_ENV)
         except InvalidGitRepositoryError:
             raise NotAGitRepositoryError(
                 f"Not a git repository: {self.repo_path}\n"
                 "Please run this command from within a git repository."
             )
 
+    def _run_git(self, args: List[str], text: bool = False) -> subprocess.CompletedProcess:
+        """Run a git command in this repository (see run_git)."""
+        return run_git(self.repo_path, args, text=text)
+
+    def get_commit_bundle(
+        self, rev: str = "HEAD", compact: bool = False
+    ) -> Optional[Tuple[str, str, List[str], str]]:
+        """
+        Get a commit's SHA, message, changed files and diff with one ``git show``.
+
+        The SHA and message are printed first, delimited by the bytes 0x01 and
+        0x02 (which do not occur in commit messages), followed by the numstat
+        records and the patch (see parse_numstat_patch).
+
+        Args:
+            rev: Commit SHA or reference.
+            compact: Produce a smaller patch (one context line, histogram diff).
+
+        Returns:
+            Tuple of (sha, message, file_paths, diff_content), or None if the
+            commit does not exist.
+
+        Raises:
+            subprocess.TimeoutExpired: If git does not finish within 30 seconds.
+        """
+        args = [
+            "show", "--format=%H%x01%B%x02", "--numstat", "-z", "-p",
+            *(COMPACT_DIFF_ARGS if compact else ()), rev,
+        ]
+        output = stream_git_output(self.repo_path, args)
+        if output is None:
+            return None
+
+        header_end = output.find(b"\x02")
+        if header_end == -1:
+            return None
+        sha, _, message = bytes(output[:header_end]).partition(b"\x01")
+        # Skip the record terminator and newline git puts before the numstat block
+        pos = header_end + 1
+        while pos < len(output) and output[pos] in b"\0\n":
+            pos += 1
+
+        diff_content, file_paths = parse_numstat_patch(output, pos)
+        return (
+            sha.decode("ascii").strip(),
+            message.decode("utf-8", errors="replace").strip(),
+            file_paths,
+            diff_content,
+        )
+
     def get_staged_changes(self) -> StagedChanges:
         """
         Get all staged changes (git diff --cached).
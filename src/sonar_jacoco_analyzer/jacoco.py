@@ -12,6 +12,7 @@ import re
 import zipfile
 import tempfile
 import shutil
+import subprocess
 from html.parser import HTMLParser
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
@@ -227,7 +228,6 @@ def find_7zip_executables() -> List[str]:
         List of paths to 7z executables found
     """
     import platform
-    import subprocess
 
     found_paths = []
 
@@ -340,8 +340,6 @@ def extract_archive(archive_path: str, extract_to: str) -> bool:
             return True
         except ImportError:
             # Fall back to system 7z command
-            import subprocess
-
             # Use the selected 7zip path if available
             seven_zip_cmd = get_7zip_path() or '7z'
 
@@ -0,0 +1,123 @@
+"""
+On-disk cache of commit message responses, keyed by the exact prompt.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "git-commit-ai", "llm")
+STATS_FILE_NAME = "stats.json"
+
+
+def make_key(
+    model: str, temperature: float, max_tokens: int, messages: List[Dict[str, str]]
+) -> str:
+    """
+    Build the cache key for a chat completion request.
+
+    Only parameters that affect the response are hashed; the messages already
+    contain the (truncated) diff, the file list and any context.
+
+    Args:
+        model: Model name.
+        temperature: Sampling temperature.
+        max_tokens: Completion token limit.
+        messages: Chat messages sent to the API.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        {"model": model, "temp": temperature, "max_tokens": max_tokens, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    """Path of the cache file for a key."""
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _read_json(path: str) -> Optional[dict]:
+    """Read a JSON object from path, or None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: dict):
+    """Write a JSON object to path, ignoring errors (the cache is optional)."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def get(key: str) -> Optional[dict]:
+    """
+    Look up a cached response and count the hit or miss.
+
+    Args:
+        key: Key from make_key().
+
+    Returns:
+        The parsed response (as passed to GeneratedCommit.from_dict), or None
+        if there is no fresh entry.
+    """
+    path = _entry_path(key)
+    entry = _read_json(path)
+    if entry is not None and entry.get("expires", 0) < time.time():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        entry = None
+
+    stats = load_stats()
+    if entry is None:
+        stats["misses"] += 1
+    else:
+        stats["hits"] += 1
+        stats["saved_tokens"] += entry.get("tokens", 0)
+    _write_json(os.path.join(CACHE_DIR, STATS_FILE_NAME), stats)
+
+    return entry["data"] if entry is not None else None
+
+
+def put(key: str, data: dict, ttl: int, tokens: int = 0):
+    """
+    Store a response.
+
+    Args:
+        key: Key from make_key().
+        data: Parsed response.
+        ttl: Seconds the entry stays valid.
+        tokens: Tokens the request used, counted as saved on each hit.
+    """
+    entry = {"expires": time.time() + ttl, "tokens": tokens, "data": data}
+    _write_json(_entry_path(key), entry)
+
+
+def load_stats() -> Dict[str, int]:
+    """
+    Get the hit, miss and saved-token counters.
+
+    Returns:
+        Dictionary with 'hits', 'misses' and 'saved_tokens'.
+    """
+    stats = {"hits": 0, "misses": 0, "saved_tokens": 0}
+    stored = _read_json(os.path.join(CACHE_DIR, STATS_FILE_NAME)) or {}
+    for name in stats:
+        if isinstance(stored.get(name), int):
+            stats[name] = stored[name]
+    return stats
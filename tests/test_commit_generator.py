@@ -6,6 +6,7 @@ import json
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 
+from sonar_jacoco_analyzer import llm_cache
 from sonar_jacoco_analyzer.commit_generator import (
     CommitGenerator,
     GeneratedCommit,
@@ -18,6 +19,13 @@ from sonar_jacoco_analyzer.commit_generator import (
 )
 from sonar_jacoco_analyzer.conventional_commit import CommitType
 from sonar_jacoco_analyzer.commit_config import CommitConfig
+from sonar_jacoco_analyzer.git_operations import FileChange
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path, monkeypatch):
+    """Keep the response cache out of the real home directory."""
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", str(tmp_path / "llm"))
 
 
 class TestGeneratedCommit:
@@ -223,6 +231,37 @@ class TestCommitGenerator:
         # Should not raise and should truncate
         assert commit is not None
 
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_commit_message_reads_iterable_diff_lazily(self, mock_openai):
+        """Test that an iterable diff is only consumed up to the truncation limit."""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content=json.dumps({
+                "type": "feat",
+                "scope": None,
+                "subject": "update code",
+                "body": None,
+                "breaking": False,
+                "breaking_description": None,
+            })))
+        ]
+        mock_openai.return_value.chat.completions.create.return_value = mock_response
+
+        config = CommitConfig(openai_api_key="test_key")
+        generator = CommitGenerator(config)
+
+        chunks = iter(["+" + "x" * 5000 + "\n"] * 4)
+        commit = generator.generate_commit_message(
+            diff_content=chunks,
+            file_paths=["test.py"],
+        )
+
+        assert commit is not None
+        # Two chunks already exceed the limit; the rest stay unread
+        assert len(list(chunks)) == 2
+        messages = mock_openai.return_value.chat.completions.create.call_args[1]["messages"]
+        assert "... (truncated)" in messages[1]["content"]
+
     @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
     def test_generate_commit_message_empty_response(self, mock_openai):
         """Test handling empty API response."""
@@ -255,6 +294,100 @@ class TestCommitGenerator:
                 file_paths=["test.py"],
             )
 
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_commit_message_reuses_cached_response(self, mock_openai):
+        """Test that an identical prompt is answered from the cache."""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content=json.dumps({
+                "type": "fix",
+                "scope": None,
+                "subject": "handle empty input",
+                "body": None,
+                "breaking": False,
+                "breaking_description": None,
+            })))
+        ]
+        mock_response.usage = Mock(total_tokens=420)
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = mock_response
+
+        generator = CommitGenerator(CommitConfig(openai_api_key="test_key"))
+        first = generator.generate_commit_message("+fix", ["src/app.py"])
+        second = generator.generate_commit_message("+fix", ["src/app.py"])
+
+        assert create.call_count == 1
+        assert second.formatted_message == first.formatted_message
+        assert llm_cache.load_stats() == {"hits": 1, "misses": 1, "saved_tokens": 420}
+
+        # A different diff, or bypassing the cache, calls the API again
+        generator.generate_commit_message("+other", ["src/app.py"])
+        generator.generate_commit_message("+fix", ["src/app.py"], use_cache=False)
+        assert create.call_count == 3
+
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_commit_message_cache_disabled(self, mock_openai):
+        """Test that llm_cache_ttl=0 always calls the API."""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content=json.dumps({"type": "fix", "subject": "fix bug"})))
+        ]
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = mock_response
+
+        generator = CommitGenerator(CommitConfig(openai_api_key="test_key", llm_cache_ttl=0))
+        generator.generate_commit_message("+fix", ["src/app.py"])
+        generator.generate_commit_message("+fix", ["src/app.py"])
+
+        assert create.call_count == 2
+
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_trivial_commit_for_small_docs_change(self, mock_openai):
+        """Test that a tiny docs change gets a local message."""
+        generator = CommitGenerator(CommitConfig(openai_api_key="test_key"))
+
+        commit = generator.generate_trivial_commit(
+            FileChange(file_path="README.md", status="M", additions=1, deletions=1)
+        )
+
+        assert commit is not None
+        assert commit.type == CommitType.DOCS
+        assert "update README.md" in commit.formatted_message
+        mock_openai.return_value.chat.completions.create.assert_not_called()
+
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_trivial_commit_skips_source_and_large_changes(self, mock_openai):
+        """Test that source files and larger changes still need the API."""
+        generator = CommitGenerator(CommitConfig(openai_api_key="test_key"))
+
+        source = FileChange(file_path="src/app.py", status="M", additions=1, deletions=0)
+        large = FileChange(file_path="README.md", status="M", additions=40, deletions=2)
+
+        assert generator.generate_trivial_commit(source) is None
+        assert generator.generate_trivial_commit(large) is None
+
+    @patch("sonar_jacoco_analyzer.commit_generator.OpenAI")
+    def test_generate_trivial_commit_matches_names_not_substrings(self, mock_openai):
+        """Test that only exact file names and extensions pick the type locally."""
+        generator = CommitGenerator(CommitConfig(openai_api_key="test_key"))
+
+        def trivial_type(path):
+            commit = generator.generate_trivial_commit(
+                FileChange(file_path=path, status="M", additions=1, deletions=0)
+            )
+            return commit.type if commit else None
+
+        assert trivial_type("src/latest/foo.py") is None
+        assert trivial_type("src/app/contest/views.py") is None
+        assert trivial_type("src/readme_parser.py") is None
+        assert trivial_type(".github/scripts/release.py") is None
+        assert trivial_type("tests/test_app.py") == CommitType.TEST
+        assert trivial_type("requirements.txt") == CommitType.BUILD
+        assert trivial_type("CMakeLists.txt") == CommitType.BUILD
+        assert trivial_type(".github/workflows/ci.yml") == CommitType.CI
+        assert trivial_type("docs/guide.rst") == CommitType.DOCS
+        assert trivial_type("notes.txt") is None
+
 
 class TestValidateConventionalCommit:
     """Tests for validate_conventional_commit function."""
@@ -17,6 +17,7 @@ from sonar_jacoco_analyzer.git_operations import (
     StagedChanges,
     ChangeMetrics,
     CommitResult,
+    run_git,
 )
 
 
@@ -359,3 +360,55 @@ class TestGitOperations:
 
         assert "commit" in log.lower() or "abc123" in log
         mock_repo.git.log.assert_called_once_with("-1", "--stat", "--no-color")
+
+    @patch("sonar_jacoco_analyzer.git_operations.subprocess.run")
+    def test_run_git_disables_locks_and_gc(self, mock_run):
+        """Test git subprocesses skip optional locks, auto-gc and the pager."""
+        run_git("/path/to/repo", ["diff", "--cached"], text=True)
+
+        args, kwargs = mock_run.call_args
+        assert os.path.basename(args[0][0]).startswith("git")
+        assert args[0][1:] == [
+            "--no-pager", "-c", "core.preloadindex=true", "-c", "gc.auto=0",
+            "-C", "/path/to/repo", "diff", "--cached",
+        ]
+        assert kwargs["env"]["GIT_OPTIONAL_LOCKS"] == "0"
+        assert kwargs["env"]["GIT_PAGER"] == "cat"
+        assert kwargs["encoding"] == "utf-8"
+
+    @patch("sonar_jacoco_analyzer.git_operations.stream_git_output")
+    @patch("sonar_jacoco_analyzer.git_operations.Repo")
+    def test_get_commit_bundle(self, mock_repo_class, mock_stream):
+        """Test SHA, message, files and diff are parsed from one git show."""
+        mock_repo = Mock()
+        mock_repo.working_dir = "/path/to/repo"
+        mock_repo_class.return_value = mock_repo
+        mock_stream.return_value = bytearray(
+            b"abc123\x01feat: add x\n\nbody\n\x02\0\n"
+            b"1\t0\tx.py\0" b"0\t0\t\0old.py\0new.py\0" b"\0"
+            b"diff --git a/x.py b/x.py\n+x\n"
+        )
+
+        git_ops = GitOperations("/path/to/repo")
+        bundle = git_ops.get_commit_bundle("abc123")
+
+        assert bundle == (
+            "abc123",
+            "feat: add x\n\nbody",
+            ["x.py", "new.py"],
+            "diff --git a/x.py b/x.py\n+x\n",
+        )
+        assert mock_stream.call_args[0][1][-1] == "abc123"
+
+    @patch("sonar_jacoco_analyzer.git_operations.stream_git_output")
+    @patch("sonar_jacoco_analyzer.git_operations.Repo")
+    def test_get_commit_bundle_unknown_commit(self, mock_repo_class, mock_stream):
+        """Test a failed git show returns None."""
+        mock_repo = Mock()
+        mock_repo.working_dir = "/path/to/repo"
+        mock_repo_class.return_value = mock_repo
+        mock_stream.return_value = None
+
+        git_ops = GitOperations("/path/to/repo")
+
+        assert git_ops.get_commit_bundle("deadbeef") is None